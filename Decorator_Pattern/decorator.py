@@ -8,30 +8,69 @@ class TextComponent(ABC):
     
 class PlainText(TextComponent):
     def __init__(self, content: str):
+        self._version = 0
         self.content = content
 
+    # Every assignment bumps the version, which is what decorator chains check their cache against
+    @property
+    def content(self) -> str:
+        return self._content
+
+    @content.setter
+    def content(self, value: str):
+        self._content = value
+        self._version += 1
+
     def render(self) -> str:
-        return self.content
+        return self._content
     
 class TextDecorator(TextComponent):
+    # Decorators that only wrap text set these instead of overriding render, so chains can be flattened
+    prefix = ""
+    suffix = ""
+
     def __init__(self, component: TextComponent):
         self._component = component
+        self._flat = None       # (base, prefix, suffix) for the whole chain below this layer
+        self._cached = None     # (base version, rendered text)
+
+    def _flatten(self):
+        # Walks the chain iteratively, so depth is not bounded by the recursion limit and each side is joined once
+        prefixes, suffixes = [], []
+        layer = self
+        if type(self).render is not TextDecorator.render:
+            # Reached via super().render() from an override, which adds its own decoration: render what this layer wraps
+            layer = self._component
+        while isinstance(layer, TextDecorator) and type(layer).render is TextDecorator.render:
+            prefixes.append(layer.prefix)
+            suffixes.append(layer.suffix)
+            layer = layer._component
+        suffixes.reverse()
+        self._flat = (layer, "".join(prefixes), "".join(suffixes))
+        return self._flat
 
     def render(self) -> str:
-        return self._component.render()
+        base, prefix, suffix = self._flat or self._flatten()
+        version = getattr(base, "_version", None)
+        if version is None:
+            # A component we cannot version (e.g. a decorator overriding render) is rendered every time
+            return prefix + base.render() + suffix
+        cached = self._cached
+        if cached is not None and cached[0] == version:
+            return cached[1]
+        text = prefix + base.render() + suffix
+        self._cached = (version, text)
+        return text
 
 # These are my decorators 
 class BoldDecorator(TextDecorator):
-    def render(self) -> str:
-        return f"**{self._component.render()}**"
+    prefix = suffix = "**"
 
 class ItalicDecorator(TextDecorator):
-    def render(self) -> str:
-        return f"_{self._component.render()}_"
+    prefix = suffix = "_"
 
 class UnderlineDecorator(TextDecorator):
-    def render(self) -> str:
-        return f"<u>{self._component.render()}</u>"
+    prefix, suffix = "<u>", "</u>"
     
 if __name__ == "__main__":
     text = PlainText("Hello, Design Patterns!")
@@ -1,7 +1,12 @@
 
 #Implement the Factory Method design pattern in Python to create a flexible system for handling different types of payment methods (e.g., Credit Card, PayPal, Bitcoin). #
 
+import threading
+import time
 from abc import ABC,abstractmethod
+from collections import deque
+from contextlib import contextmanager
+from typing import Callable, Dict, List, NamedTuple, Optional
 
 class PaymentProcessor(ABC):
     """ABC for the PaymentProccessors """
@@ -53,13 +58,227 @@ class BankTransferFactory(PaymentProcessorFactory):
         return BankTransferProcessor()
     
 
-def client_code(paymentprocessorfactory : PaymentProcessorFactory,amount : float):
-    # I am not suppling the PaymentProcessor I am creating its object 
-    processor = paymentprocessorfactory.create_processor()
-    processor.process_payment(amount)
+
+class PoolMetrics(NamedTuple):
+    size: int           # processors alive, idle or checked out
+    idle: int
+    in_use: int
+    created: int
+    reused: int
+    evicted: int        # closed after sitting idle longer than max_idle
+    unhealthy: int      # discarded by the health check or on return
+    waits: int          # checkouts that had to wait for a free processor
+    timeouts: int
+
+
+def _close_processor(processor):
+    close = getattr(processor, "close", None)
+    if callable(close):
+        try:
+            close()
+        except Exception:
+            pass  # the processor is being dropped either way
+
+
+class ProcessorPool:
+    """
+    Bounded, thread-safe pool of processors built by one factory. Processors are created
+    lazily up to max_size and reused most-recently-returned first, so surplus ones go idle
+    and are evicted after max_idle seconds. health_check(processor) -> bool runs on every
+    checkout of a reused processor; failures, including a check that raises, are closed
+    and replaced.
+    """
+    def __init__(self, factory: PaymentProcessorFactory, max_size: int = 8, max_idle: Optional[float] = 300.0,
+                 health_check: Optional[Callable[[PaymentProcessor], bool]] = None):
+        if max_size < 1:
+            raise ValueError("max_size must be at least 1")
+        self.factory = factory
+        self.max_size = max_size
+        self.max_idle = max_idle
+        self._health_check = health_check
+        self._idle = deque()        # (processor, returned_at), most recent on the right
+        self._size = 0
+        self._closed = False
+        self._cond = threading.Condition()
+        self._created = self._reused = self._evicted = self._unhealthy = self._waits = self._timeouts = 0
+
+    def checkout(self, timeout: Optional[float] = None) -> PaymentProcessor:
+        """Takes a processor, waiting up to timeout seconds when all max_size are in use"""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            processor = None
+            with self._cond:
+                waited = False
+                while True:
+                    if self._closed:
+                        raise RuntimeError("Pool is closed")
+                    expired = self._expire_locked()
+                    if self._idle:
+                        processor = self._idle.pop()[0]
+                        break
+                    if self._size < self.max_size:
+                        self._size += 1
+                        break
+                    if not waited:
+                        self._waits += 1
+                        waited = True
+                    remaining = None if deadline is None else deadline - time.monotonic()
+                    if remaining is not None and remaining <= 0:
+                        self._timeouts += 1
+                        raise TimeoutError(f"No processor free within {timeout}s")
+                    self._cond.wait(remaining)
+            for stale in expired:
+                _close_processor(stale)
+
+            if processor is None:
+                try:
+                    processor = self.factory.create_processor()
+                except BaseException:
+                    self._forget(None)
+                    raise
+                with self._cond:
+                    self._created += 1
+                return processor
+
+            try:
+                healthy = self._health_check is None or self._health_check(processor)
+            except Exception:
+                healthy = False  # a check that cannot run says nothing good about the processor
+            if healthy:
+                with self._cond:
+                    self._reused += 1
+                return processor
+            with self._cond:
+                self._unhealthy += 1
+            self._forget(processor)
+
+    def checkin(self, processor: PaymentProcessor, discard: bool = False):
+        """Returns a processor to the pool; discard=True closes it instead (e.g. a broken client)"""
+        with self._cond:
+            if not (discard or self._closed):
+                self._idle.append((processor, time.monotonic()))
+                self._cond.notify()
+                return
+            if discard:
+                self._unhealthy += 1
+        self._forget(processor)
+
+    @contextmanager
+    def lease(self, timeout: Optional[float] = None, discard_on_error: bool = True):
+        """checkout/checkin as a with-block; an exception in the block discards the processor
+        unless discard_on_error is False (e.g. when errors are declines, not broken clients)"""
+        processor = self.checkout(timeout)
+        try:
+            yield processor
+        except BaseException:
+            self.checkin(processor, discard=discard_on_error)
+            raise
+        self.checkin(processor)
+
+    def _forget(self, processor: Optional[PaymentProcessor]):
+        with self._cond:
+            self._size -= 1
+            self._cond.notify()
+        if processor is not None:
+            _close_processor(processor)
+
+    def _expire_locked(self) -> List[PaymentProcessor]:
+        # Oldest returns sit on the left, so expiry stops at the first fresh entry
+        if self.max_idle is None:
+            return []
+        cutoff = time.monotonic() - self.max_idle
+        expired = []
+        while self._idle and self._idle[0][1] < cutoff:
+            expired.append(self._idle.popleft()[0])
+        self._size -= len(expired)
+        self._evicted += len(expired)
+        return expired
+
+    def evict_idle(self) -> int:
+        """Closes processors idle for longer than max_idle; checkout also does this lazily"""
+        with self._cond:
+            expired = self._expire_locked()
+        for processor in expired:
+            _close_processor(processor)
+        return len(expired)
+
+    def metrics(self) -> PoolMetrics:
+        with self._cond:
+            return PoolMetrics(self._size, len(self._idle), self._size - len(self._idle), self._created,
+                               self._reused, self._evicted, self._unhealthy, self._waits, self._timeouts)
+
+    def close(self):
+        """Closes idle processors now and checked-out ones as they are returned"""
+        with self._cond:
+            self._closed = True
+            idle = [processor for processor, _ in self._idle]
+            self._idle.clear()
+            self._size -= len(idle)
+            self._cond.notify_all()
+        for processor in idle:
+            _close_processor(processor)
+
+
+class FactoryRegistry:
+    """Factories looked up by name, each fronted by its own ProcessorPool"""
+    def __init__(self):
+        self._pools: Dict[str, ProcessorPool] = {}
+        self._lock = threading.Lock()
+
+    def register(self, name: str, factory: PaymentProcessorFactory, **pool_options) -> ProcessorPool:
+        with self._lock:
+            if name in self._pools:
+                raise ValueError(f"A factory is already registered as '{name}'")
+            pool = self._pools[name] = ProcessorPool(factory, **pool_options)
+        return pool
+
+    def unregister(self, name: str):
+        with self._lock:
+            pool = self._pools.pop(name)
+        pool.close()
+
+    def pool(self, name: str) -> ProcessorPool:
+        try:
+            return self._pools[name]
+        except KeyError:
+            raise KeyError(f"No factory registered as '{name}'") from None
+
+    def factory(self, name: str) -> PaymentProcessorFactory:
+        return self.pool(name).factory
+
+    def lease(self, name: str, timeout: Optional[float] = None, discard_on_error: bool = True):
+        return self.pool(name).lease(timeout, discard_on_error)
+
+    def names(self) -> List[str]:
+        return list(self._pools)
+
+    def metrics(self) -> Dict[str, PoolMetrics]:
+        return {name: pool.metrics() for name, pool in list(self._pools.items())}
+
+
+registry = FactoryRegistry()
+
+
+def client_code(paymentprocessorfactory , amount : float, idempotency_key: Optional[str] = None, cache=None):
+    def pay():
+        # A registered name leases a pooled processor; a factory still builds a fresh one per payment
+        if isinstance(paymentprocessorfactory, str):
+            # A failed payment is usually a decline, not a broken client, so the processor stays pooled
+            with registry.lease(paymentprocessorfactory, discard_on_error=False) as processor:
+                return processor.process_payment(amount)
+        # I am not suppling the PaymentProcessor I am creating its object 
+        processor = paymentprocessorfactory.create_processor()
+        return processor.process_payment(amount)
+
+    # With an IdempotencyCache (payment_idempotency.py) a retry under the same key never reaches a processor
+    if cache is not None and idempotency_key is not None:
+        return cache.execute(idempotency_key, "payment", amount, pay)
+    return pay()
     
 
 
 creditcardfactory = CreditCardPaymentFactory()
 bankfactory = BankTransferFactory()
-client_code(paymentprocessorfactory=bankfactory,amount=200)
\ No newline at end of file
+registry.register("credit_card", creditcardfactory)
+registry.register("bank_transfer", bankfactory)
+client_code(paymentprocessorfactory="bank_transfer",amount=200)
\ No newline at end of file
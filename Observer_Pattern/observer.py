@@ -1,6 +1,14 @@
+import asyncio
+import math
+import os
+import time
+import weakref
 from abc import ABC, abstractmethod
-from typing import List, Dict
+from array import array
+from collections import deque
+from typing import List, Dict, Iterable, Optional, Set, Tuple
 from enum import Enum
+from functools import partial
 
 
 class SubscriptionModel(Enum):
@@ -24,65 +32,350 @@ class Investor(ABC):
     
 
 
+class OverflowPolicy(Enum):
+    """What an AsyncDispatcher does when an investor's queue is full"""
+    DROP_OLDEST = 1
+    COALESCE_LATEST = 2
+    BLOCK = 3
+
+
+class _InvestorQueue:
+    def __init__(self):
+        self.items = deque()
+        self.ready = asyncio.Event()
+        self.space = asyncio.Event()
+        self.idle = asyncio.Event()
+
+
+class AsyncDispatcher:
+    """
+    Summary
+    	Delivers price updates through a bounded queue per investor, drained by one asyncio task per investor, so a slow investor only delays its own updates. Investors may define `async def update_async(price)`. Otherwise their synchronous update runs in a worker thread (or inline on the loop when offload_sync is False). Must be used from the event loop's thread.
+    Arguments
+    	maxsize (int): capacity of each investor's queue
+    	policy (OverflowPolicy): DROP_OLDEST discards the oldest queued price, COALESCE_LATEST overwrites the newest queued price, BLOCK makes submit_async wait for space (the synchronous submit raises asyncio.QueueFull instead of blocking)
+    	offload_sync (bool): run synchronous Investor.update calls in a thread rather than on the loop
+    Returns
+    	None: updates are delivered in the background, await join() to wait for them
+    """
+    def __init__(self, maxsize: int = 1000, policy: OverflowPolicy = OverflowPolicy.DROP_OLDEST,
+                 offload_sync: bool = True):
+        if maxsize < 1:
+            raise ValueError("maxsize must be at least 1")
+        self.maxsize = maxsize
+        self.policy = policy
+        self.offload_sync = offload_sync
+        self.dropped = 0
+        # Queues and delivery tasks hold investors weakly; a collected investor's task just exits.
+        # Keyed by identity like SubscriberRegistry, so unhashable or equal investors get their own queue.
+        self._queues: Dict[int, Tuple["weakref.ref[Investor]", _InvestorQueue]] = {}
+        self._tasks: Set[asyncio.Task] = set()
+
+    def _pruner(self, key: int):
+        dispatcher = weakref.ref(self)
+
+        def prune(ref):
+            self_ = dispatcher()
+            if self_ is not None:
+                entry = self_._queues.get(key)
+                if entry is not None and entry[0] is ref:
+                    del self_._queues[key]
+        return prune
+
+    def _queue_for(self, investor: Investor) -> _InvestorQueue:
+        key = id(investor)
+        entry = self._queues.get(key)
+        if entry is not None and entry[0]() is investor:
+            return entry[1]
+        queue = _InvestorQueue()
+        ref = weakref.ref(investor, self._pruner(key))
+        self._queues[key] = (ref, queue)
+        task = asyncio.get_running_loop().create_task(self._deliver(ref, queue))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        weakref.finalize(investor, queue.ready.set)
+        return queue
+
+    def submit(self, investor: Investor, price: float):
+        queue = self._queue_for(investor)
+        if len(queue.items) >= self.maxsize:
+            if self.policy is OverflowPolicy.BLOCK:
+                raise asyncio.QueueFull(f"Queue for {investor.__class__.__name__} is full")
+            self.dropped += 1
+            if self.policy is OverflowPolicy.COALESCE_LATEST:
+                queue.items[-1] = price
+                return
+            queue.items.popleft()
+        self._enqueue(queue, price)
+
+    async def submit_async(self, investor: Investor, price: float):
+        queue = self._queue_for(investor)
+        if self.policy is OverflowPolicy.BLOCK:
+            while len(queue.items) >= self.maxsize:
+                queue.space.clear()
+                await queue.space.wait()
+            self._enqueue(queue, price)
+        else:
+            self.submit(investor, price)
+
+    def _enqueue(self, queue: _InvestorQueue, price: float):
+        queue.items.append(price)
+        queue.idle.clear()
+        queue.ready.set()
+
+    async def _deliver(self, investor_ref: "weakref.ref[Investor]", queue: _InvestorQueue):
+        while True:
+            while not queue.items and investor_ref() is not None:
+                queue.idle.set()
+                queue.ready.clear()
+                await queue.ready.wait()
+            investor = investor_ref()
+            if investor is None:
+                break
+            price = queue.items.popleft()
+            queue.space.set()
+            update_async = getattr(investor, "update_async", None)
+            try:
+                if update_async is not None:
+                    await update_async(price)
+                elif self.offload_sync:
+                    await asyncio.to_thread(investor.update, price)
+                else:
+                    investor.update(price)
+            except Exception as e:
+                asyncio.get_running_loop().call_exception_handler({
+                    "message": f"{investor.__class__.__name__}.update failed",
+                    "exception": e,
+                })
+            # Drop the strong references before waiting again so the investor can be collected
+            investor = update_async = None
+        queue.idle.set()
+
+    async def join(self):
+        """Waits until every queued update has been delivered"""
+        for _, queue in list(self._queues.values()):
+            await queue.idle.wait()
+
+    async def close(self):
+        """Stops all delivery tasks, discarding undelivered updates"""
+        tasks = list(self._tasks)
+        self._queues.clear()
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+
+class SubscriberRegistry:
+    """
+    Summary
+    	Insertion-ordered set of investors held by weak reference. add, remove and contains are O(1), duplicates are ignored, and an investor that is garbage collected drops out of the registry on its own.
+    Arguments
+    	investor (Investor): the investor to add, remove or look up
+    Returns
+    	None: iterate the registry to get the live investors in subscription order
+    """
+    def __init__(self):
+        self._refs: Dict[int, "weakref.ref[Investor]"] = {}
+
+    def _pruner(self, key: int):
+        registry = weakref.ref(self)
+
+        def prune(ref):
+            self_ = registry()
+            if self_ is not None and self_._refs.get(key) is ref:
+                del self_._refs[key]
+        return prune
+
+    def add(self, investor: Investor) -> bool:
+        """Returns False if the investor was already subscribed"""
+        key = id(investor)
+        ref = self._refs.get(key)
+        if ref is not None and ref() is investor:
+            return False
+        self._refs[key] = weakref.ref(investor, self._pruner(key))
+        return True
+
+    def discard(self, investor: Investor) -> bool:
+        """Returns False if the investor was not subscribed"""
+        if investor not in self:
+            return False
+        del self._refs[id(investor)]
+        return True
+
+    def remove(self, investor: Investor):
+        if not self.discard(investor):
+            raise ValueError(f"{investor!r} is not subscribed")
+
+    def __contains__(self, investor) -> bool:
+        ref = self._refs.get(id(investor))
+        return ref is not None and ref() is investor
+
+    def __len__(self) -> int:
+        return len(self._refs)
+
+    def __iter__(self):
+        # Snapshot, so investors may subscribe or unsubscribe while being notified
+        investors = [ref() for ref in self._refs.values()]
+        return iter([investor for investor in investors if investor is not None])
+
+
 class Stock: 
     """
     Summary
-    	This class represents a Stock with its symbol, price, and a list of investors. It provides methods to add, remove, and notify investors when the stock price is updated.
+    	This class represents a Stock with its symbol, price, and a weak registry of investors. It provides methods to add, remove, and notify investors when the stock price is updated.
     Arguments
     	symbol (str): the symbol of the stock
     	investor (Investor): the investor to be added or removed
     	price (float): the new price of the stock
+    	dispatcher (AsyncDispatcher): optional, queues notifications instead of calling investors inline
+    	history (PriceHistory): optional, every price update is appended to it
     Returns
     	None: the class methods do not return any value, they modify the object state or notify investors
     """
-    def __init__(self, symbol):
+    def __init__(self, symbol, dispatcher: Optional[AsyncDispatcher] = None, history=None):
         self._symbol = symbol
         self._price = 0.0
-        self._investors: List[Investor] = []
+        self._investors = SubscriberRegistry()
+        self._dispatcher = dispatcher
+        self._history = history
+        # Called whenever the investor list changes, so a StockManager can refresh its index
+        self._on_investors_changed = None
     
     def add_investors(self, investor: Investor):
-        if isinstance(investor, Investor):
-            self._investors.append(investor)
+        if isinstance(investor, Investor) and self._investors.add(investor):
+            self._investors_changed()
         
     def remove_investor(self, investor: Investor):
         if isinstance(investor, Investor):
             self._investors.remove(investor)
+            self._investors_changed()
+    
+    def _investors_changed(self):
+        if self._on_investors_changed is not None:
+            self._on_investors_changed()
         
     def notify_investor(self):
+        if self._dispatcher is not None:
+            for investor in self._investors:
+                self._dispatcher.submit(investor, self._price)
+            return
         for investor in self._investors:
             investor.update(self._price)
             
-    def update_price(self, price):
+    def update_price(self, price, volume: float = 0.0, timestamp: Optional[float] = None):
         self._price = price
+        if self._history is not None:
+            self._record(price, volume, timestamp)
         self.notify_investor()
 
+    async def update_price_async(self, price, volume: float = 0.0, timestamp: Optional[float] = None):
+        """Like update_price, but waits for queue space when the dispatcher's policy is BLOCK"""
+        self._price = price
+        if self._history is not None:
+            self._record(price, volume, timestamp)
+        if self._dispatcher is None:
+            self.notify_investor()
+            return
+        for investor in self._investors:
+            await self._dispatcher.submit_async(investor, price)
+
+    @property
+    def history(self):
+        return self._history
+
+    def _record(self, price, volume: float, timestamp: Optional[float]):
+        if timestamp is None:
+            # The wall clock can step backwards; the history must stay ordered
+            timestamp = max(time.time(), self._history.last_timestamp)
+        self._history.append(timestamp, price, volume)
+
+class StreamingStats:
+    """
+    Summary
+    	Constant-time, bounded-memory statistics over a stream of prices, shared by the Investor implementations. It tracks the running mean and population variance (Welford), min/max, an exponentially weighted moving average, and the average of the last `window` prices held in an array-backed ring buffer.
+    Arguments
+    	window (int): number of most recent prices kept for the windowed average
+    	alpha (float): EWMA smoothing factor in (0, 1], higher reacts faster
+    Returns
+    	None: call push for each price and read the statistics from the attributes and properties
+    """
+    def __init__(self, window: int = 20, alpha: float = 0.1):
+        if window < 1:
+            raise ValueError("window must be at least 1")
+        if not 0 < alpha <= 1:
+            raise ValueError("alpha must be in (0, 1]")
+        self.alpha = alpha
+        self.count = 0
+        self.mean = 0.0
+        self.min = math.inf
+        self.max = -math.inf
+        self.ewma: Optional[float] = None
+        self._m2 = 0.0
+        self._ring = array('d', bytes(8 * window))
+        self._head = 0
+        self._filled = 0
+        self._window_sum = 0.0
+
+    def push(self, price: float):
+        self.count += 1
+        delta = price - self.mean
+        self.mean += delta / self.count
+        self._m2 += delta * (price - self.mean)
+        if price < self.min:
+            self.min = price
+        if price > self.max:
+            self.max = price
+        self.ewma = price if self.ewma is None else self.ewma + self.alpha * (price - self.ewma)
+
+        ring = self._ring
+        if self._filled == len(ring):
+            self._window_sum -= ring[self._head]
+        else:
+            self._filled += 1
+        ring[self._head] = price
+        self._window_sum += price
+        self._head += 1
+        if self._head == len(ring):
+            self._head = 0
+            # Resum once per wrap so floating-point drift from add/subtract cannot build up
+            self._window_sum = sum(ring)
+
+    @property
+    def variance(self) -> float:
+        return self._m2 / self.count if self.count else 0.0
+
+    @property
+    def window_mean(self) -> float:
+        return self._window_sum / self._filled if self._filled else 0.0
+
+
 class RupayStocksAPI(Investor):
     """
     Summary
-    	This class represents a Rupay Stocks API, which is a subclass of Investor. It is used to track and update stock prices, and calculate the average price. The class has an initializer method to set up an empty list to store prices, and an update method to add new prices to the list and print the current and average prices.
+    	This class represents a Rupay Stocks API, which is a subclass of Investor. It is used to track and update stock prices, and calculate the average price. The class has an initializer method to set up a StreamingStats tracker, and an update method to push each new price into it and print the current price and the running average, in constant time and memory however many prices arrive.
     Arguments
-    	price (float): the new price to be added to the list
+    	price (float): the new price to be pushed into the streaming statistics
     Returns
     	None: the function does not return any value, it prints the current and average prices instead
     """
     def __init__(self):
-        self._prices = []
+        self._stats = StreamingStats()
         
     def update(self, price):
-        self._prices.append(price)
-        print(f"Current Price upgraded {price} for and average price is {sum(self._prices)/len(self._prices)} {self.__class__.__name__}")
+        self._stats.push(price)
+        print(f"Current Price upgraded {price} for and average price is {self._stats.mean} {self.__class__.__name__}")
         
 class GrowStocksAPI(Investor):
     def __init__(self):
-        self._prices = []
+        self._stats = StreamingStats()
         
     def update(self, price):
-        self._prices.append(price)
-        print(f"Current Price upgraded for stock {price} for and average price is {sum(self._prices)/len(self._prices)} {self.__class__.__name__}")
+        self._stats.push(price)
+        print(f"Current Price upgraded for stock {price} for and average price is {self._stats.mean} {self.__class__.__name__}")
 
 class FivePaisa(Investor):
     def __init__(self):
-        self._prices = []
+        self._stats = StreamingStats()
         
     def update(self, price):
         """AI is creating summary for update
@@ -90,14 +383,22 @@ class FivePaisa(Investor):
         Args:
             price ([type]): [description]
         """
-        self._prices.append(price)
-        print(f"Current Price upgraded {price} for and average price is {sum(self._prices)/len(self._prices)} {self.__class__.__name__}")
+        self._stats.push(price)
+        print(f"Current Price upgraded {price} for and average price is {self._stats.mean} {self.__class__.__name__}")
         
 
 class StockManager:
-    def __init__(self):
+    def __init__(self, dispatcher: Optional[AsyncDispatcher] = None, history_dir: Optional[str] = None):
         self._stocks: Dict[str, Stock] = {}
+        self._dispatcher = dispatcher
+        # When set, each stock records its prices to <history_dir>/<symbol>.hist
+        self._history_dir = history_dir
+        if history_dir is not None:
+            os.makedirs(history_dir, exist_ok=True)
         self._default_investors: List[Investor] = []
+        # id(investor) -> (weak ref, symbols it follows); rebuilt lazily after any subscription change.
+        # Keyed by identity like SubscriberRegistry and weak so it does not keep investors alive.
+        self._investor_index: Optional[Dict[int, Tuple["weakref.ref[Investor]", Set[str]]]] = None
 
     def register_default_investor(self, investor: Investor):
         self._default_investors.append(investor)
@@ -107,10 +408,17 @@ class StockManager:
             print(f"Stock with symbol {symbol} already exists. Returning existing instance.")
             return self._stocks[symbol]
         
-        stock = Stock(symbol)
+        history = None
+        if self._history_dir is not None:
+            # Imported here so NumPy is only needed when history is enabled
+            from price_history import PriceHistory
+            history = PriceHistory(os.path.join(self._history_dir, f"{symbol}.hist"))
+        stock = Stock(symbol, self._dispatcher, history)
+        stock._on_investors_changed = self._invalidate_index
         for investor in self._default_investors:
             stock.add_investors(investor)
         self._stocks[symbol] = stock
+        self._invalidate_index()
         return stock
 
     def get_stock(self, symbol: str) -> Stock:
@@ -122,6 +430,90 @@ class StockManager:
         for stock in self._stocks.values():
             stock.add_investors(investor)
 
+    def remove_investor_from_all_stocks(self, investor: Investor):
+        """Unsubscribes an investor everywhere, touching only the stocks it actually follows"""
+        entry = self._get_investor_index().get(id(investor))
+        if entry is not None and entry[0]() is investor:
+            for symbol in entry[1]:
+                self._stocks[symbol]._investors.discard(investor)
+        self._default_investors = [other for other in self._default_investors if other is not investor]
+        self._invalidate_index()
+
+    def publish_batch(self, ticks: Iterable[Tuple]):
+        """
+        Summary
+        	Applies a batch of ticks. Ticks for the same symbol are coalesced, so every investor is notified once per symbol with the latest price. Dispatch walks the investor -> symbols index, delivering each investor's updates together instead of looping over every stock's investor list. Every tick is still written to the stock's history, with its volume and timestamp when the tick carries them.
+        Arguments
+        	ticks (Iterable[Tuple]): (symbol, price[, volume[, timestamp]]) tuples in arrival order; volume defaults to 0.0 and timestamp to now
+        Returns
+        	None: prices are updated in place and investors are notified
+        """
+        # History keeps every tick, only notifications are coalesced
+        recorded: Optional[List[Tuple]] = [] if self._history_dir is not None else None
+        latest: Dict[str, float] = {}
+        for tick in ticks:
+            symbol, price = tick[0], tick[1]
+            latest[symbol] = price
+            if recorded is not None:
+                recorded.append(tick)
+        missing = latest.keys() - self._stocks.keys()
+        if missing:
+            raise KeyError(f"Stocks with symbols {sorted(missing)} do not exist.")
+        
+        if recorded:
+            for tick in recorded:
+                stock = self._stocks[tick[0]]
+                if stock.history is not None:
+                    volume = tick[2] if len(tick) > 2 else 0.0
+                    timestamp = tick[3] if len(tick) > 3 else None
+                    stock._record(tick[1], volume, timestamp)
+        for symbol, price in latest.items():
+            self._stocks[symbol]._price = price
+        
+        dispatcher = self._dispatcher
+        for ref, symbols in list(self._get_investor_index().values()):
+            investor = ref()
+            if investor is None:
+                continue
+            notify = investor.update if dispatcher is None else partial(dispatcher.submit, investor)
+            if len(symbols) < len(latest):
+                for symbol in symbols:
+                    if symbol in latest:
+                        notify(latest[symbol])
+            else:
+                for symbol, price in latest.items():
+                    if symbol in symbols:
+                        notify(price)
+
+    def flush_history(self):
+        """Persists every stock's recorded history to its memory-mapped file"""
+        for stock in self._stocks.values():
+            if stock.history is not None:
+                stock.history.flush()
+
+    def _invalidate_index(self):
+        self._investor_index = None
+
+    def _get_investor_index(self) -> Dict[int, Tuple["weakref.ref[Investor]", Set[str]]]:
+        if self._investor_index is None:
+            index: Dict[int, Tuple["weakref.ref[Investor]", Set[str]]] = {}
+
+            def pruner(key: int):
+                def prune(ref):
+                    entry = index.get(key)
+                    if entry is not None and entry[0] is ref:
+                        del index[key]
+                return prune
+
+            for symbol, stock in self._stocks.items():
+                for investor in stock._investors:
+                    key = id(investor)
+                    if key not in index:
+                        index[key] = (weakref.ref(investor, pruner(key)), set())
+                    index[key][1].add(symbol)
+            self._investor_index = index
+        return self._investor_index
+
 if __name__ == '__main__':
     stock_manager = StockManager()
 
@@ -0,0 +1,213 @@
+"""
+Tick replay and throughput benchmark for the Observer pipeline.
+
+Ticks come from a recorded file, read through mmap so the file is never loaded whole, or
+are generated synthetically. They are driven through Stock.update_price (or
+StockManager.publish_batch with --batch) with silent synthetic investors, and the run
+reports end-to-end ticks/sec (reading included), p50/p99 notify latency and peak memory.
+
+Tick files:
+    CSV      one "symbol,price" per line
+    binary   packed TICK_RECORD structs (16-byte NUL-padded symbol, float64 price), *.bin
+
+Usage:
+    python observer_benchmark.py --symbols 1000 --investors 50 --ticks 200000
+    python observer_benchmark.py --write ticks.bin --symbols 1000 --ticks 1000000
+    python observer_benchmark.py --replay ticks.bin --investors 50 --batch 1000
+"""
+import argparse
+import mmap
+import random
+import resource
+import struct
+import sys
+import time
+import tracemalloc
+from typing import Iterator, List, Tuple
+
+from observer import Investor, StockManager, StreamingStats
+
+
+TICK_RECORD = struct.Struct("<16sd")
+
+
+class CountingInvestor(Investor):
+    """Does the least an investor can do, so the numbers measure dispatch itself"""
+    def __init__(self):
+        self.count = 0
+
+    def update(self, price):
+        self.count += 1
+
+
+class StatsInvestor(Investor):
+    """Keeps StreamingStats like the API investors, without printing"""
+    def __init__(self):
+        self._stats = StreamingStats()
+
+    def update(self, price):
+        self._stats.push(price)
+
+
+INVESTORS = {"counting": CountingInvestor, "stats": StatsInvestor}
+
+
+def synthetic_ticks(symbols: int, ticks: int, seed: int = 0) -> Iterator[Tuple[str, float]]:
+    """Random walk prices over symbols named S0..S{symbols-1}"""
+    rng = random.Random(seed)
+    prices = [100.0] * symbols
+    for _ in range(ticks):
+        i = rng.randrange(symbols)
+        prices[i] *= 1.0 + rng.gauss(0.0, 0.001)
+        yield f"S{i}", prices[i]
+
+
+def write_ticks(path: str, ticks: Iterator[Tuple[str, float]]) -> int:
+    count = 0
+    binary = path.endswith(".bin")
+    with open(path, "wb") as f:
+        for symbol, price in ticks:
+            if binary:
+                f.write(TICK_RECORD.pack(symbol.encode(), price))
+            else:
+                f.write(f"{symbol},{price!r}\n".encode())
+            count += 1
+    return count
+
+
+def read_ticks(path: str) -> Iterator[Tuple[str, float]]:
+    """Memory-mapped reader for CSV or binary tick files"""
+    with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        if path.endswith(".bin"):
+            usable = len(mm) - len(mm) % TICK_RECORD.size
+            with memoryview(mm) as view, view[:usable] as records:
+                for raw_symbol, price in TICK_RECORD.iter_unpack(records):
+                    yield raw_symbol.rstrip(b"\0").decode(), price
+        else:
+            for line in iter(mm.readline, b""):
+                symbol, _, price = line.partition(b",")
+                if price:
+                    yield symbol.decode(), float(price)
+
+
+def _percentile(sorted_values: List[int], q: float) -> float:
+    if not sorted_values:
+        return 0.0
+    return sorted_values[min(len(sorted_values) - 1, int(q * len(sorted_values)))]
+
+
+def run(ticks: Iterator[Tuple[str, float]], investors: int, investor_kind: str = "counting",
+        fanout: int = 0, batch: int = 0, trace_memory: bool = False) -> dict:
+    """
+    Replays ticks through a fresh StockManager. Stocks are created on first sight. Each stock
+    gets `fanout` investors taken round-robin from the pool (every investor when fanout is 0).
+    Latency is measured per update_price call, or per publish_batch call when batching.
+    """
+    manager = StockManager()
+    pool = [INVESTORS[investor_kind]() for _ in range(investors)]
+    if not fanout or fanout >= investors:
+        for investor in pool:
+            manager.register_default_investor(investor)
+    stocks = {}
+
+    def stock_for(symbol):
+        stock = stocks.get(symbol)
+        if stock is None:
+            stock = stocks[symbol] = manager.create_stock(symbol)
+            if fanout and fanout < investors:
+                start = len(stocks) * fanout
+                for i in range(fanout):
+                    stock.add_investors(pool[(start + i) % investors])
+        return stock
+
+    if trace_memory:
+        tracemalloc.start()
+    latencies = []
+    count = 0
+    clock = time.perf_counter_ns
+    started = clock()
+    if batch:
+        pending = []
+        for symbol, price in ticks:
+            stock_for(symbol)
+            pending.append((symbol, price))
+            if len(pending) == batch:
+                t0 = clock()
+                manager.publish_batch(pending)
+                latencies.append(clock() - t0)
+                count += len(pending)
+                pending = []
+        if pending:
+            t0 = clock()
+            manager.publish_batch(pending)
+            latencies.append(clock() - t0)
+            count += len(pending)
+    else:
+        for symbol, price in ticks:
+            stock = stock_for(symbol)
+            t0 = clock()
+            stock.update_price(price)
+            latencies.append(clock() - t0)
+            count += 1
+    elapsed = (clock() - started) / 1e9
+
+    if trace_memory:
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+    else:
+        # ru_maxrss is KiB on Linux
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+    latencies.sort()
+    return {
+        "ticks": count,
+        "symbols": len(stocks),
+        "investors": investors,
+        "seconds": elapsed,
+        "ticks_per_s": count / elapsed if elapsed else 0.0,
+        "p50_us": _percentile(latencies, 0.50) / 1e3,
+        "p99_us": _percentile(latencies, 0.99) / 1e3,
+        "peak_bytes": peak,
+        "peak_source": "tracemalloc" if trace_memory else "ru_maxrss",
+    }
+
+
+def format_report(result: dict, batch: int) -> str:
+    unit = f"per batch of {batch}" if batch else "per tick"
+    return "\n".join([
+        f"Ticks       : {result['ticks']} over {result['symbols']} symbols, {result['investors']} investors",
+        f"Throughput  : {result['ticks_per_s']:,.0f} ticks/s ({result['seconds']:.3f}s)",
+        f"Latency     : p50 {result['p50_us']:.2f}us, p99 {result['p99_us']:.2f}us ({unit})",
+        f"Peak memory : {result['peak_bytes'] / 2**20:.1f} MiB ({result['peak_source']})",
+    ])
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Replay ticks through the Observer pipeline")
+    parser.add_argument("--replay", metavar="PATH", help="tick file to replay (.csv or .bin)")
+    parser.add_argument("--write", metavar="PATH", help="write synthetic ticks to PATH and exit")
+    parser.add_argument("--symbols", type=int, default=1000, help="synthetic symbol count")
+    parser.add_argument("--ticks", type=int, default=200_000, help="synthetic tick count")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--investors", type=int, default=10)
+    parser.add_argument("--investor-kind", choices=sorted(INVESTORS), default="counting")
+    parser.add_argument("--fanout", type=int, default=0,
+                        help="investors per stock, round-robin from the pool (0 = all)")
+    parser.add_argument("--batch", type=int, default=0,
+                        help="publish through StockManager.publish_batch in batches of this size")
+    parser.add_argument("--tracemalloc", action="store_true",
+                        help="measure peak memory with tracemalloc (slower) instead of ru_maxrss")
+    args = parser.parse_args(argv)
+
+    if args.write:
+        count = write_ticks(args.write, synthetic_ticks(args.symbols, args.ticks, args.seed))
+        print(f"Wrote {count} ticks to {args.write}")
+        return 0
+
+    ticks = read_ticks(args.replay) if args.replay else synthetic_ticks(args.symbols, args.ticks, args.seed)
+    result = run(ticks, args.investors, args.investor_kind, args.fanout, args.batch, args.tracemalloc)
+    print(format_report(result, args.batch))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
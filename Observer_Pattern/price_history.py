@@ -0,0 +1,143 @@
+import os
+import struct
+from typing import Optional, Tuple
+
+import numpy as np
+
+
+_MAGIC = b"PHIST001"
+_HEADER = struct.Struct("<8sQQ")    # magic, committed row count, capacity
+_HEADER_BYTES = 64                  # header padded so the columns stay 8-byte aligned
+_COLUMNS = ("timestamp", "price", "volume")
+
+
+class PriceHistory:
+    """
+    Summary
+    	Append-only columnar history for one symbol. Timestamps, prices and volumes are float64 columns in a single memory-mapped file, so history survives restarts. Range queries run on NumPy views of the mapping instead of building Python objects per row. Rows must arrive in non-decreasing timestamp order. The file doubles its capacity when full, and flush() commits the row count to the header.
+    Arguments
+    	path (str): file backing this symbol's history, created if missing
+    	capacity (int): initial number of rows to reserve for a new file
+    	start, end (float): inclusive timestamp bounds of a query, None for unbounded
+    Returns
+    	None: query methods return NumPy views or scalars computed over the selected rows
+    """
+    def __init__(self, path: str, capacity: int = 4096):
+        self._path = path
+        if os.path.exists(path) and os.path.getsize(path) >= _HEADER_BYTES:
+            with open(path, "rb") as f:
+                magic, count, capacity = _HEADER.unpack(f.read(_HEADER.size))
+            if magic != _MAGIC:
+                raise ValueError(f"{path} is not a price history file")
+            self._map(capacity)
+            self._count = count
+        else:
+            self._create(path, max(1, capacity))
+            self._map(max(1, capacity))
+            self._count = 0
+
+    @staticmethod
+    def _create(path: str, capacity: int):
+        with open(path, "wb") as f:
+            f.write(_HEADER.pack(_MAGIC, 0, capacity).ljust(_HEADER_BYTES, b"\0"))
+            f.truncate(_HEADER_BYTES + len(_COLUMNS) * capacity * 8)
+
+    def _map(self, capacity: int):
+        self._capacity = capacity
+        self._mm = np.memmap(self._path, dtype=np.float64, mode="r+", offset=_HEADER_BYTES,
+                             shape=(len(_COLUMNS), capacity))
+        self._ts, self._px, self._vol = self._mm
+
+    def _grow(self):
+        """Doubles capacity by writing a new file and swapping it in"""
+        capacity = self._capacity * 2
+        tmp = self._path + ".grow"
+        self._create(tmp, capacity)
+        grown = np.memmap(tmp, dtype=np.float64, mode="r+", offset=_HEADER_BYTES,
+                          shape=(len(_COLUMNS), capacity))
+        grown[:, :self._count] = self._mm[:, :self._count]
+        grown.flush()
+        del grown
+        self._release()
+        os.replace(tmp, self._path)
+        self._map(capacity)
+        self._write_header()
+
+    def _release(self):
+        self._mm.flush()
+        self._mm = self._ts = self._px = self._vol = None
+
+    def _write_header(self):
+        with open(self._path, "r+b") as f:
+            f.write(_HEADER.pack(_MAGIC, self._count, self._capacity))
+
+    def __len__(self) -> int:
+        return self._count
+
+    @property
+    def last_timestamp(self) -> float:
+        return float(self._ts[self._count - 1]) if self._count else float("-inf")
+
+    def append(self, timestamp: float, price: float, volume: float = 0.0):
+        if timestamp < self.last_timestamp:
+            raise ValueError(f"Timestamp {timestamp} is older than the last row {self.last_timestamp}")
+        if self._count == self._capacity:
+            self._grow()
+        i = self._count
+        self._ts[i] = timestamp
+        self._px[i] = price
+        self._vol[i] = volume
+        self._count = i + 1
+
+    def flush(self):
+        """Writes appended rows to disk and commits the row count"""
+        self._mm.flush()
+        self._write_header()
+
+    def close(self):
+        self.flush()
+        self._release()
+
+    def _bounds(self, start: Optional[float], end: Optional[float]) -> Tuple[int, int]:
+        ts = self._ts[:self._count]
+        lo = 0 if start is None else int(np.searchsorted(ts, start, side="left"))
+        hi = self._count if end is None else int(np.searchsorted(ts, end, side="right"))
+        return lo, max(lo, hi)
+
+    def range(self, start: Optional[float] = None, end: Optional[float] = None):
+        """Zero-copy (timestamps, prices, volumes) views of the rows within [start, end]"""
+        lo, hi = self._bounds(start, end)
+        return self._ts[lo:hi], self._px[lo:hi], self._vol[lo:hi]
+
+    def ohlc(self, start: Optional[float] = None,
+             end: Optional[float] = None) -> Optional[Tuple[float, float, float, float]]:
+        lo, hi = self._bounds(start, end)
+        if lo == hi:
+            return None
+        prices = self._px[lo:hi]
+        return float(prices[0]), float(prices.max()), float(prices.min()), float(prices[-1])
+
+    def vwap(self, start: Optional[float] = None, end: Optional[float] = None) -> Optional[float]:
+        """Volume-weighted average price, None when the window carries no volume"""
+        lo, hi = self._bounds(start, end)
+        volume = float(self._vol[lo:hi].sum())
+        if volume == 0.0:
+            return None
+        return float(np.dot(self._px[lo:hi], self._vol[lo:hi])) / volume
+
+    def ohlc_bars(self, interval: float, start: Optional[float] = None, end: Optional[float] = None):
+        """
+        OHLC bars of `interval` seconds over [start, end], as (bar_start, open, high, low, close)
+        arrays with one entry per non-empty bar
+        """
+        lo, hi = self._bounds(start, end)
+        ts, prices = self._ts[lo:hi], self._px[lo:hi]
+        if not len(ts):
+            empty = np.empty(0)
+            return empty, empty, empty, empty, empty
+        origin = ts[0] if start is None else start
+        buckets = np.floor((ts - origin) / interval)
+        first = np.flatnonzero(np.r_[True, buckets[1:] != buckets[:-1]])
+        last = np.r_[first[1:] - 1, len(ts) - 1]
+        return (origin + buckets[first] * interval, prices[first],
+                np.maximum.reduceat(prices, first), np.minimum.reduceat(prices, first), prices[last])
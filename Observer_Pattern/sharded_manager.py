@@ -0,0 +1,286 @@
+import os
+import pickle
+import struct
+import time
+import traceback
+import zlib
+from multiprocessing import get_context
+from multiprocessing.shared_memory import SharedMemory
+from typing import Dict, Iterable, List, Tuple
+
+from observer import Investor, StockManager
+
+
+_HEADER_SIZE = 16                   # head (written by producer), tail (written by consumer)
+_RECORD = struct.Struct("iid")      # kind, symbol id, price
+_TICK = 0
+_CONTROL = 1
+
+
+class _Ring:
+    """
+    Summary
+    	Single-producer/single-consumer ring of fixed-size (kind, symbol_id, price) records in shared memory. Each side keeps its own index locally and only reads the other side's index from the header when the ring looks full or empty.
+    Arguments
+    	buf (memoryview): shared memory of at least _Ring.size_for(capacity) bytes
+    	capacity (int): number of records the ring holds
+    	consumer_alive (callable): checked while the producer waits on a full ring, so a dead consumer raises instead of hanging
+    Returns
+    	None
+    """
+    def __init__(self, buf, capacity: int, consumer_alive=None):
+        self._buf = buf
+        self._consumer_alive = consumer_alive
+        # Indices go through a typed view: each assignment is one aligned 8-byte store, whereas
+        # struct.pack_into zero-fills the target first and a reader could observe the zeros
+        self._index = buf[:_HEADER_SIZE].cast("Q")
+        self._capacity = capacity
+        self._head = 0
+        self._tail = 0
+        self._head_seen = 0
+        self._tail_seen = 0
+
+    @staticmethod
+    def size_for(capacity: int) -> int:
+        return _HEADER_SIZE + capacity * _RECORD.size
+
+    def _offset(self, index: int) -> int:
+        return _HEADER_SIZE + (index % self._capacity) * _RECORD.size
+
+    def push(self, kind: int, symbol_id: int, price: float):
+        head = self._head
+        while head - self._tail_seen >= self._capacity:
+            self._tail_seen = self._index[1]
+            if head - self._tail_seen >= self._capacity:
+                if self._consumer_alive is not None and not self._consumer_alive():
+                    raise RuntimeError("Ring consumer exited; nothing will drain the ring")
+                time.sleep(0)  # consumer is behind, back-pressure the producer
+        _RECORD.pack_into(self._buf, self._offset(head), kind, symbol_id, price)
+        # Publish the new head only after the record itself is written
+        self._head = head + 1
+        self._index[0] = self._head
+
+    def pending(self) -> int:
+        """Records the consumer has not committed yet, as seen by the producer"""
+        return self._head - self._index[1]
+
+    def read_batch(self, limit: int) -> List[Tuple[int, int, float]]:
+        if self._tail == self._head_seen:
+            self._head_seen = self._index[0]
+        count = min(self._head_seen - self._tail, limit)
+        return [_RECORD.unpack_from(self._buf, self._offset(self._tail + i)) for i in range(count)]
+
+    def commit(self, count: int):
+        self._tail += count
+        self._index[1] = self._tail
+
+    def release(self):
+        """Drops the typed view so the shared memory can be closed"""
+        self._index.release()
+
+
+def _shard_worker(shm_name: str, capacity: int, control, batch_size: int):
+    """Runs one shard: a plain StockManager fed from the ring, with investors living in this process"""
+    shm = SharedMemory(name=shm_name)
+    ring = _Ring(shm.buf, capacity)
+    manager = StockManager()
+    stocks = {}
+    investors: Dict[int, Investor] = {}
+    idle = 0.0
+    try:
+        while True:
+            records = ring.read_batch(batch_size)
+            if not records:
+                time.sleep(idle)
+                idle = min(idle * 2 or 1e-5, 1e-3)
+                continue
+            idle = 0.0
+            for kind, symbol_id, price in records:
+                if kind == _TICK:
+                    try:
+                        stocks[symbol_id].update_price(price)
+                    except Exception:
+                        traceback.print_exc()
+                    continue
+                # Control payloads travel over the queue; the ring marker keeps them ordered with ticks
+                op, *args = control.get()
+                if op == "stop":
+                    ring.commit(len(records))
+                    return
+                if op == "investor":
+                    token, payload = args
+                    investors[token] = pickle.loads(payload)
+                elif op == "register":
+                    manager.register_default_investor(investors[args[0]])
+                elif op == "create":
+                    symbol, new_id = args
+                    stocks[new_id] = manager.create_stock(symbol)
+                elif op == "add_all":
+                    manager.add_investor_to_all_stocks(investors[args[0]])
+                elif op == "subscribe":
+                    stocks[args[0]].add_investors(investors[args[1]])
+                elif op == "unsubscribe":
+                    stocks[args[0]].remove_investor(investors[args[1]])
+            ring.commit(len(records))
+    finally:
+        ring.release()
+        shm.close()
+
+
+class ShardedStock:
+    """
+    Summary
+    	Handle returned by ShardedStockManager for a stock that lives in a worker process. update_price routes the tick through the shard's ring buffer, and investors are notified inside that worker.
+    Arguments
+    	symbol (str): the symbol of the stock
+    	price (float): the new price of the stock
+    	investor (Investor): the investor to be added or removed, copied into the worker on first use
+    Returns
+    	None: prices are published asynchronously to the owning shard
+    """
+    def __init__(self, manager: "ShardedStockManager", symbol: str, shard: int, symbol_id: int):
+        self._manager = manager
+        self._symbol = symbol
+        self._shard = shard
+        self._symbol_id = symbol_id
+        self._price = 0.0
+
+    def add_investors(self, investor: Investor):
+        if isinstance(investor, Investor):
+            token = self._manager._send_investor(self._shard, investor)
+            self._manager._control(self._shard, "subscribe", self._symbol_id, token)
+
+    def remove_investor(self, investor: Investor):
+        if isinstance(investor, Investor):
+            token = self._manager._send_investor(self._shard, investor)
+            self._manager._control(self._shard, "unsubscribe", self._symbol_id, token)
+
+    def update_price(self, price):
+        self._price = price
+        self._manager._rings[self._shard].push(_TICK, self._symbol_id, price)
+
+
+class ShardedStockManager:
+    """
+    Summary
+    	StockManager that partitions symbols across worker processes by a stable hash of the symbol. Ticks reach each shard over a shared-memory ring buffer, so tick processing scales with cores. Investors must be picklable. Each shard holds its own copy of an investor, and that copy is notified in the worker process.
+    Arguments
+    	num_shards (int): number of worker processes, defaults to the CPU count
+    	ring_capacity (int): records per shard ring; a full ring back-pressures the publisher
+    	batch_size (int): maximum records a worker drains before committing its read index
+    Returns
+    	None: use as a context manager, or call close() to stop the workers
+    """
+    def __init__(self, num_shards: int = None, ring_capacity: int = 1 << 16, batch_size: int = 512):
+        self._num_shards = num_shards or os.cpu_count() or 1
+        self._stocks: Dict[str, ShardedStock] = {}
+        self._investor_tokens: Dict[Investor, int] = {}
+        self._sent: List[set] = [set() for _ in range(self._num_shards)]
+        self._shms: List[SharedMemory] = []
+        self._rings: List[_Ring] = []
+        self._queues = []
+        self._workers = []
+        self._closed = False
+
+        ctx = get_context()
+        for _ in range(self._num_shards):
+            shm = SharedMemory(create=True, size=_Ring.size_for(ring_capacity))
+            shm.buf[:_HEADER_SIZE] = bytes(_HEADER_SIZE)
+            queue = ctx.Queue()
+            worker = ctx.Process(target=_shard_worker, args=(shm.name, ring_capacity, queue, batch_size),
+                                 daemon=True)
+            worker.start()
+            self._shms.append(shm)
+            self._rings.append(_Ring(shm.buf, ring_capacity, worker.is_alive))
+            self._queues.append(queue)
+            self._workers.append(worker)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, tb):
+        self.close()
+        return False
+
+    def _shard_of(self, symbol: str) -> int:
+        # crc32 rather than hash(): str hashing is randomised per process
+        return zlib.crc32(symbol.encode()) % self._num_shards
+
+    def _control(self, shard: int, op: str, *args):
+        self._queues[shard].put((op, *args))
+        self._rings[shard].push(_CONTROL, 0, 0.0)
+
+    def _send_investor(self, shard: int, investor: Investor) -> int:
+        token = self._investor_tokens.setdefault(investor, len(self._investor_tokens))
+        if token not in self._sent[shard]:
+            # Pickled here rather than by the queue's feeder thread, so an unpicklable investor
+            # raises to the caller instead of desynchronising the worker's control stream
+            payload = pickle.dumps(investor)
+            self._control(shard, "investor", token, payload)
+            self._sent[shard].add(token)
+        return token
+
+    def register_default_investor(self, investor: Investor):
+        for shard in range(self._num_shards):
+            self._control(shard, "register", self._send_investor(shard, investor))
+
+    def create_stock(self, symbol: str) -> ShardedStock:
+        if symbol in self._stocks:
+            print(f"Stock with symbol {symbol} already exists. Returning existing instance.")
+            return self._stocks[symbol]
+
+        shard = self._shard_of(symbol)
+        stock = ShardedStock(self, symbol, shard, len(self._stocks))
+        self._control(shard, "create", symbol, stock._symbol_id)
+        self._stocks[symbol] = stock
+        return stock
+
+    def get_stock(self, symbol: str) -> ShardedStock:
+        if symbol not in self._stocks:
+            raise KeyError(f"Stock with symbol '{symbol}' does not exist.")
+        return self._stocks[symbol]
+
+    def add_investor_to_all_stocks(self, investor: Investor):
+        for shard in range(self._num_shards):
+            self._control(shard, "add_all", self._send_investor(shard, investor))
+
+    def publish_batch(self, ticks: Iterable[Tuple[str, float]]):
+        for symbol, price in ticks:
+            self.get_stock(symbol).update_price(price)
+
+    def flush(self, timeout: float = None):
+        """Waits until every shard has processed everything published so far"""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        for ring, worker in zip(self._rings, self._workers):
+            while ring.pending():
+                if not worker.is_alive():
+                    raise RuntimeError(f"Shard worker {worker.pid} exited unexpectedly")
+                if deadline is not None and time.monotonic() > deadline:
+                    raise TimeoutError("Shards did not drain before the timeout")
+                time.sleep(1e-4)
+
+    def close(self, timeout: float = 5.0):
+        """Stops the workers, terminating any that do not exit within timeout, and frees the rings"""
+        if self._closed:
+            return
+        self._closed = True
+        for shard, worker in enumerate(self._workers):
+            if worker.is_alive():
+                try:
+                    self._control(shard, "stop")
+                except RuntimeError:
+                    pass  # the worker died meanwhile; it is reaped below
+        deadline = time.monotonic() + timeout
+        for worker in self._workers:
+            worker.join(max(0.0, deadline - time.monotonic()))
+            if worker.is_alive():
+                worker.terminate()
+                worker.join()
+        for ring in self._rings:
+            ring.release()
+        self._rings.clear()
+        for queue in self._queues:
+            queue.close()
+        for shm in self._shms:
+            shm.close()
+            shm.unlink()
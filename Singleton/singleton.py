@@ -1,15 +1,414 @@
+import atexit
 import logging
 import json
-from threading import Lock
-from copy import deepcopy
+import os
+import queue
+import re
+import zlib
+from collections import deque
+from collections.abc import Mapping
+from logging.handlers import QueueHandler, RotatingFileHandler
+from threading import Event, Lock, Thread
+from types import MappingProxyType
+from typing import Callable, Dict, List, NamedTuple, Optional, Tuple
 
-# Logger for Basic Logging 
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(levelname)s - %(message)s',
-    filename='app.log',
-    filemode='a'  # Append mode
-)
+class AsyncLogPipeline:
+    """
+    Summary
+    	Non-blocking log sink. Callers only put records on an in-memory queue through `handler`. A background thread drains the queue in batches, writes each batch with a single write and flush, and rolls the file over by size. Disk I/O therefore never runs on the thread that logged.
+    Arguments
+    	filename (str): log file, rotated to filename.1 .. filename.<backup_count>
+    	max_bytes (int): size at which the file is rolled over, 0 to never rotate
+    	backup_count (int): number of rotated files to keep
+    	batch_size (int): most records written per batch
+    Returns
+    	None: call flush() to wait for queued records, close() on shutdown
+    """
+    _STOP = object()
+
+    def __init__(self, filename: str = 'app.log', max_bytes: int = 10 * 2**20, backup_count: int = 5,
+                 batch_size: int = 256, fmt: str = '%(asctime)s - %(levelname)s - %(message)s'):
+        self._queue = queue.SimpleQueue()
+        self.handler = QueueHandler(self._queue)
+        self._file = RotatingFileHandler(filename, maxBytes=max_bytes, backupCount=backup_count, delay=True)
+        self._file.setFormatter(logging.Formatter(fmt))
+        self._batch_size = batch_size
+        self._closed = False
+        self._thread = Thread(target=self._run, name="log-writer", daemon=True)
+        self._thread.start()
+
+    def _run(self):
+        while True:
+            batch = [self._queue.get()]
+            while len(batch) < self._batch_size:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            records = []
+            for item in batch:
+                if isinstance(item, logging.LogRecord):
+                    records.append(item)
+                    continue
+                # Markers are handled in queue order, after every record queued before them
+                self._write(records)
+                records = []
+                if item is self._STOP:
+                    self._file.close()
+                    return
+                item.set()  # flush() waiter
+            self._write(records)
+
+    def _write(self, records: List[logging.LogRecord]):
+        if not records:
+            return
+        file = self._file
+        try:
+            text = "".join(file.format(record) + file.terminator for record in records)
+            if file.stream is None:
+                file.stream = file._open()
+            # Size-based rollover per batch, so a batch is never split across files
+            if file.maxBytes and file.stream.tell() and file.stream.tell() + len(text) >= file.maxBytes:
+                file.doRollover()
+                if file.stream is None:
+                    file.stream = file._open()
+            file.stream.write(text)
+            file.stream.flush()
+        except Exception:
+            file.handleError(records[-1])
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """Blocks until everything logged so far is on disk; False if the timeout expired first"""
+        if self._closed:
+            return True
+        done = Event()
+        self._queue.put(done)
+        return done.wait(timeout)
+
+    def close(self, timeout: Optional[float] = None):
+        """Writes out the remaining records and stops the writer thread"""
+        if self._closed:
+            return
+        self._closed = True
+        self._queue.put(self._STOP)
+        self._thread.join(timeout)
+
+# Module logger: records are queued and written to app.log by the pipeline's thread
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.INFO)
+logger.propagate = False
+_log_pipeline = AsyncLogPipeline('app.log')
+logger.addHandler(_log_pipeline.handler)
+atexit.register(_log_pipeline.close)
+
+def flush_logs(timeout: Optional[float] = None) -> bool:
+    return _log_pipeline.flush(timeout)
+
+def _freeze(value, old_raw=None, old_frozen=None):
+    """Read-only view of parsed JSON: dicts become mapping proxies and lists become tuples.
+    Top-level sections equal to the previous load reuse its frozen views."""
+    if isinstance(value, dict):
+        frozen = {}
+        for k, v in value.items():
+            if old_frozen is not None and k in old_raw and old_raw[k] == v:
+                frozen[k] = old_frozen[k]
+            else:
+                frozen[k] = _freeze(v)
+        return MappingProxyType(frozen)
+    if isinstance(value, list):
+        return tuple(_freeze(v) for v in value)
+    return value
+
+def _flatten(snapshot, prefix: str = "", index: Optional[dict] = None) -> dict:
+    """Maps every dotted path ("db", "db.pool", "db.pool.size") to its frozen value.
+    Breadth-first, so a literal dotted key wins over a deeper path spelling the same string."""
+    index = {} if index is None else index
+    queue = deque([(prefix, snapshot)])
+    while queue:
+        prefix, mapping = queue.popleft()
+        for k, v in mapping.items():
+            path = f"{prefix}.{k}" if prefix else k
+            index.setdefault(path, v)
+            if isinstance(v, MappingProxyType):
+                queue.append((path, v))
+    return index
+
+_TRUE = {"true", "yes", "on", "1"}
+_FALSE = {"false", "no", "off", "0"}
+
+def _coerce(value, type_):
+    if type_ is None or isinstance(value, type_) and not (type_ is int and isinstance(value, bool)):
+        return value
+    if type_ is bool and isinstance(value, str):
+        lowered = value.strip().lower()
+        if lowered in _TRUE or lowered in _FALSE:
+            return lowered in _TRUE
+        raise ValueError(f"Cannot read {value!r} as bool")
+    return type_(value)
+
+_MISSING = object()
+
+def _merge(base, override):
+    """Deep merge of two parsed values; nested dicts merge key by key, anything else is replaced"""
+    if isinstance(base, dict) and isinstance(override, dict):
+        merged = dict(base)
+        for k, v in override.items():
+            merged[k] = _merge(merged[k], v) if k in merged else v
+        return merged
+    return override
+
+_SPACE = re.compile(rb"[ \t\n\r]*")
+_STRING = re.compile(rb'"[^"\\]*+(?:\\.[^"\\]*+)*+"', re.S)
+# Everything up to the next bracket outside a string, strings included, in one regex step
+_NEXT_BRACKET = re.compile(rb'(?:[^"\[\]{}]++|"[^"\\]*+(?:\\.[^"\\]*+)*+")*+([\[\]{}])', re.S)
+_SCALAR = re.compile(rb"-?[0-9][0-9.eE+-]*|true|false|null")
+_CLOSERS = {b"{": b"}", b"[": b"]"}
+
+def _skip_value(buf, pos: int) -> int:
+    """End offset of the JSON value starting at pos. Strings and brackets are matched so the value
+    can be skipped without decoding it; its contents are only validated when the section is parsed."""
+    first = buf[pos:pos + 1]
+    if first == b'"':
+        match = _STRING.match(buf, pos)
+        if match is None:
+            raise ValueError(f"Unterminated string in config layer at byte {pos}")
+        return match.end()
+    if first in _CLOSERS:
+        expected = [_CLOSERS[first]]
+        pos += 1
+        while expected:
+            match = _NEXT_BRACKET.match(buf, pos)
+            if match is None:
+                raise ValueError(f"Unbalanced brackets in config layer after byte {pos}")
+            bracket, pos = match.group(1), match.end()
+            if bracket in _CLOSERS:
+                expected.append(_CLOSERS[bracket])
+            elif bracket != expected.pop():
+                raise ValueError(f"Mismatched {bracket.decode()} in config layer at byte {pos - 1}")
+        return pos
+    match = _SCALAR.match(buf, pos)
+    if match is None:
+        raise ValueError(f"Malformed config layer near byte {pos}")
+    return match.end()
+
+def _scan_sections(buf) -> Dict[str, Tuple[int, int]]:
+    """Byte range of every top-level value in a JSON object held in a bytes-like buf.
+    Values are skipped, not decoded; only the keys are parsed."""
+    sections = {}
+    pos = _SPACE.match(buf, 0).end()
+    if buf[pos:pos + 1] != b"{":
+        raise ValueError("Config layer is not a JSON object")
+    pos = _SPACE.match(buf, pos + 1).end()
+    if buf[pos:pos + 1] == b"}":
+        return sections
+    while True:
+        match = _STRING.match(buf, pos)
+        if match is None:
+            raise ValueError(f"Malformed config layer near byte {pos}")
+        key = json.loads(match.group())  # raw UTF-8 bytes, escapes included
+        pos = _SPACE.match(buf, match.end()).end()
+        if buf[pos:pos + 1] != b":":
+            raise ValueError(f"Malformed config layer near byte {pos}")
+        start = _SPACE.match(buf, pos + 1).end()
+        end = _skip_value(buf, start)
+        sections[key] = (start, end)
+        pos = _SPACE.match(buf, end).end()
+        sep = buf[pos:pos + 1]
+        if sep == b"}":
+            return sections
+        if sep != b",":
+            raise ValueError(f"Malformed config layer near byte {pos}")
+        pos = _SPACE.match(buf, pos + 1).end()
+
+class _SectionFile:
+    """One config layer on disk, read once: its top-level layout is indexed and sections are parsed
+    from that snapshot on demand. Later edits to the file, in place or by rename, never show through;
+    they reach readers only when a reload indexes the file again."""
+    def __init__(self, path: str):
+        self.path = path
+        with open(path, "rb") as f:
+            self._data = f.read()
+        if not self._data:
+            raise ValueError(f"Config layer {path} is empty")
+        self.sections = _scan_sections(self._data)
+        with memoryview(self._data) as view:
+            # Cheap per-section fingerprints let reloads diff sections without keeping them
+            self.fingerprints = {k: (zlib.crc32(view[a:b]), b - a) for k, (a, b) in self.sections.items()}
+
+    def parse(self, key: str):
+        start, end = self.sections[key]
+        return json.loads(self._data[start:end])
+
+def _env_overrides(prefix: str, environ=None) -> dict:
+    """PREFIX_DB__POOL__SIZE=20 becomes {"db": {"pool": {"size": 20}}}; values are parsed as JSON when possible"""
+    overrides = {}
+    for name, raw in (os.environ if environ is None else environ).items():
+        if not name.startswith(prefix) or len(name) == len(prefix):
+            continue
+        *parents, leaf = name[len(prefix):].lower().split("__")
+        try:
+            value = json.loads(raw)
+        except json.JSONDecodeError:
+            value = raw
+        node = overrides
+        for part in parents:
+            child = node.get(part)
+            if not isinstance(child, dict):
+                child = node[part] = {}
+            node = child
+        node[leaf] = value
+    return overrides
+
+class LayeredConfig(Mapping):
+    """
+    Summary
+    	Read-only mapping over layered config sources: files in increasing priority, then environment overrides. Loading only scans each file's top-level layout, without parsing it. A section is parsed from each layer that has it on first access, deep-merged, frozen and cached, so startup time and memory scale with the sections a process actually reads.
+    Arguments
+    	paths (list): config files, later files override earlier ones
+    	overrides (dict): nested overrides applied on top of every file
+    Returns
+    	Frozen section values, as ConfigManager.config does for a single file
+    """
+    def __init__(self, paths: List[str], overrides: Optional[dict] = None):
+        self._files = [_SectionFile(path) for path in paths]
+        self._overrides = overrides or {}
+        self._cache = {}
+        self._lock = Lock()
+        keys = {}
+        for layer in self._files:
+            keys.update(dict.fromkeys(layer.sections))
+        keys.update(dict.fromkeys(self._overrides))
+        self.fingerprints = {
+            k: (tuple(layer.fingerprints.get(k) for layer in self._files), self._overrides.get(k))
+            for k in keys
+        }
+
+    @property
+    def paths(self) -> List[str]:
+        return [layer.path for layer in self._files]
+
+    def __getitem__(self, key):
+        value = self._cache.get(key, _MISSING)
+        if value is _MISSING:
+            if key not in self.fingerprints:
+                raise KeyError(key)
+            with self._lock:
+                value = self._cache.get(key, _MISSING)
+                if value is _MISSING:
+                    value = self._cache[key] = self._build(key)
+        return value
+
+    def _build(self, key):
+        merged = _MISSING
+        for layer in self._files:
+            if key in layer.sections:
+                value = layer.parse(key)
+                merged = value if merged is _MISSING else _merge(merged, value)
+        if key in self._overrides:
+            value = self._overrides[key]
+            merged = value if merged is _MISSING else _merge(merged, value)
+        return _freeze(merged)
+
+    def __iter__(self):
+        return iter(self.fingerprints)
+
+    def __len__(self):
+        return len(self.fingerprints)
+
+    def __contains__(self, key):
+        return key in self.fingerprints
+
+    def is_loaded(self, key) -> bool:
+        return key in self._cache
+
+    def inherit(self, previous: "LayeredConfig"):
+        """Reuses previous's parsed sections whose sources did not change"""
+        for key, value in list(previous._cache.items()):
+            if previous.fingerprints.get(key) == self.fingerprints.get(key):
+                self._cache.setdefault(key, value)
+
+    def validate(self, previous: Optional["LayeredConfig"] = None):
+        """Parses every section whose sources differ from previous's and drops the result, so
+        malformed JSON raises JSONDecodeError here instead of on a reader's first access"""
+        for key, fingerprint in self.fingerprints.items():
+            if previous is not None and previous.fingerprints.get(key) == fingerprint:
+                continue
+            for layer in self._files:
+                if key in layer.sections:
+                    layer.parse(key)
+
+class _SectionIndex(dict):
+    """Dotted-path index for a LayeredConfig, filled one section at a time as paths are looked up"""
+    def __init__(self, layered: LayeredConfig):
+        super().__init__()
+        self._layered = layered
+        self._indexed = set()
+
+    def get(self, key, default=None):
+        value = dict.get(self, key, _MISSING)
+        if value is not _MISSING:
+            return value
+        # Every top-level key that is a prefix of the path may hold it ("a.b" literal or "a" -> "b")
+        pos, found = -1, False
+        while True:
+            pos = key.find(".", pos + 1)
+            section = key if pos == -1 else key[:pos]
+            if section and section in self._layered and section not in self._indexed:
+                self._index_section(section)
+                found = True
+            if pos == -1:
+                break
+        return dict.get(self, key, default) if found else default
+
+    def _index_section(self, section: str):
+        value = self._layered[section]
+        self[section] = value
+        if isinstance(value, MappingProxyType):
+            _flatten(value, section, self)
+        self._indexed.add(section)
+
+class ConfigAccessor:
+    """Precompiled lookup of one dotted path. It resolves and converts once per config load,
+    after which each call is a generation check and an attribute read."""
+    __slots__ = ("_manager", "path", "_default", "_type", "_generation", "_value")
+
+    def __init__(self, manager, path: str, default=None, type_=None):
+        self._manager = manager
+        self.path = path
+        self._default = default
+        self._type = type_
+        self._generation = -1
+        self._value = None
+
+    def __call__(self):
+        manager = self._manager
+        generation = manager._generation
+        if self._generation != generation:
+            # Generation is read before the lookup, so a concurrent reload only causes a re-resolve
+            self._value = manager.get(self.path, self._default, self._type)
+            self._generation = generation
+        return self._value
+
+    def __repr__(self):
+        return f"ConfigAccessor({self.path!r})"
+
+class ConfigDiff(NamedTuple):
+    """Top-level keys that differ between two loaded configs"""
+    added: frozenset
+    removed: frozenset
+    changed: frozenset
+
+    @property
+    def keys(self) -> frozenset:
+        return self.added | self.removed | self.changed
+
+    @classmethod
+    def between(cls, old: dict, new: dict) -> "ConfigDiff":
+        return cls(
+            added=frozenset(new.keys() - old.keys()),
+            removed=frozenset(old.keys() - new.keys()),
+            changed=frozenset(k for k in old.keys() & new.keys() if old[k] != new[k]),
+        )
 
 # Singleton Instances 
 
@@ -18,32 +417,175 @@ class ConfigManager:
     _lock = Lock()
     
     def __new__(cls, config_path=None):
+        # Double-checked: once the instance exists, callers never touch the lock
+        instance = cls._instance
+        if instance is not None:
+            return instance
         with cls._lock:
             if cls._instance is None:
-                cls._instance = super().__new__(cls)
-                cls._instance._config = {}
+                instance = super().__new__(cls)
+                instance._config = {}
+                instance._snapshot = _freeze({})
+                instance._index = {}
+                instance._generation = 0
+                instance._path = None
+                instance._fingerprints = {}
+                instance._reload = None
+                instance._swap_lock = Lock()
+                instance._listeners = []
+                instance._validator = None
+                instance._watcher = None
+                instance._stop_watching = Event()
                 if config_path:
-                    cls._instance.load_config(config_path)
+                    instance.load_config(config_path)
+                # Published only when fully initialised, so the fast path never sees a half-built instance
+                cls._instance = instance
         return cls._instance
     
     def load_config(self, path: str):
         try:
             with open(path, 'r') as f:
-                self._config = json.load(f)
-            logging.info(f"Config loaded from {path}")
-        except (FileNotFoundError, json.JSONDecodeError) as e:
-            logging.exception(f"Config load failed: {str(e)}")
+                config = json.load(f)
+            if self._validator is not None:
+                self._validator(config)
+            logger.info(f"Config loaded from {path}")
+        except (FileNotFoundError, json.JSONDecodeError, ValueError) as e:
+            logger.exception(f"Config load failed: {str(e)}")
             raise
-    # use property for getter/setter type method and deepcopy for no modification
+        self._path = path
+        self._reload = lambda: self.load_config(path)
+        self._swap(config)
+
+    def load_layers(self, base_path: str, environment: Optional[str] = None,
+                    env_prefix: Optional[str] = None):
+        """Layers base_path, then "<base>.<environment>.json" beside it when that file exists, then
+        environment variables starting with env_prefix ("__" separates nesting levels).
+        Only the top-level layout of each file is read here; sections are parsed on first access.
+        A reload over earlier layers also parses every changed section first, so a bad edit is
+        rejected and the previous config kept."""
+        paths = [base_path]
+        if environment:
+            root, ext = os.path.splitext(base_path)
+            env_path = f"{root}.{environment}{ext}"
+            if os.path.exists(env_path):
+                paths.append(env_path)
+        try:
+            layered = LayeredConfig(paths, _env_overrides(env_prefix) if env_prefix else None)
+            previous = self._config
+            if isinstance(previous, LayeredConfig):
+                layered.validate(previous)
+            if self._validator is not None:
+                self._validator(layered)
+            logger.info(f"Config layers indexed from {', '.join(paths)}")
+        except (FileNotFoundError, json.JSONDecodeError, ValueError) as e:
+            logger.exception(f"Config load failed: {str(e)}")
+            raise
+        self._path = base_path
+        self._reload = lambda: self.load_layers(base_path, environment, env_prefix)
+        self._swap(layered)
+
+    def _swap(self, config):
+        # Writers are serialised; readers never lock and see either the old or the new snapshot
+        with self._swap_lock:
+            old = self._config
+            if isinstance(config, LayeredConfig):
+                if isinstance(old, LayeredConfig):
+                    config.inherit(old)
+                snapshot, index, fingerprints = config, _SectionIndex(config), config.fingerprints
+            else:
+                snapshot = _freeze(config, old, self._snapshot) if isinstance(old, dict) else _freeze(config)
+                index, fingerprints = _flatten(snapshot), config
+            diff = ConfigDiff.between(self._fingerprints, fingerprints)
+            self._config = config
+            self._snapshot = snapshot
+            self._index = index
+            self._fingerprints = fingerprints
+            # Bumped last: an accessor that sees the new generation also sees the new index
+            self._generation += 1
+        if diff.keys:
+            self._notify(diff)
+
+    def _notify(self, diff: ConfigDiff):
+        for callback, keys in list(self._listeners):
+            if keys is None or keys & diff.keys:
+                try:
+                    callback(diff)
+                except Exception:
+                    logger.exception(f"Config listener {callback!r} failed")
+
+    def set_validator(self, validator: Optional[Callable[[dict], None]]):
+        """validator(config) raises ValueError to reject a config before it is swapped in"""
+        self._validator = validator
+
+    def add_listener(self, callback: Callable[[ConfigDiff], None], keys=None):
+        """Calls callback(diff) after a reload that touches any of keys (any key when None)"""
+        self._listeners.append((callback, frozenset(keys) if keys is not None else None))
+
+    def remove_listener(self, callback: Callable[[ConfigDiff], None]):
+        self._listeners = [(cb, keys) for cb, keys in self._listeners if cb is not callback]
+
+    def start_watching(self, path: Optional[str] = None, interval: float = 1.0):
+        """Polls the config files' mtime/size in a daemon thread and reloads when one changes.
+        Parsing and validation happen on that thread; a bad file is logged and the old config kept.
+        Without path, the sources of the last load_config or load_layers call are watched."""
+        if path is not None:
+            paths, reload = [path], lambda: self.load_config(path)
+        elif self._reload is not None:
+            paths = self._config.paths if isinstance(self._config, LayeredConfig) else [self._path]
+            reload = self._reload
+        else:
+            raise ValueError("No config path to watch")
+        self.stop_watching()
+        self._stop_watching.clear()
+        self._watcher = Thread(target=self._watch, args=(paths, reload, interval), name="config-watcher",
+                               daemon=True)
+        self._watcher.start()
+
+    def stop_watching(self):
+        if self._watcher is not None:
+            self._stop_watching.set()
+            self._watcher.join()
+            self._watcher = None
+
+    def _watch(self, paths: List[str], reload: Callable[[], None], interval: float):
+        def signature():
+            try:
+                return [(st.st_mtime_ns, st.st_size) for st in map(os.stat, paths)]
+            except OSError:
+                return None  # missing or unreadable mid-save; try again next poll
+
+        last = signature()
+        while not self._stop_watching.wait(interval):
+            current = signature()
+            if current is None or current == last:
+                continue
+            last = current
+            try:
+                reload()
+            except (FileNotFoundError, json.JSONDecodeError, ValueError):
+                pass  # already logged by load_config; keep serving the previous config
+            except Exception:
+                # Anything else must not kill the watcher thread either
+                logger.exception("Config reload failed; keeping the previous config")
+    # use property for getter/setter type method; the snapshot is read-only so it is shared, not copied
     @property
     def config(self):
-        return deepcopy(self._config)  # Prevent external modifications
+        return self._snapshot  # Immutable view, rebuilt only by load_config
         
     def read_configs(self):
         for k, v in self._config.items():
             print(f"{k} : {v}")
 
-    def get(self, key, default=None):
-        return self._config.get(key, default)
+    def get(self, key, default=None, type=None):
+        """Looks up a top-level key or a dotted path such as "db.pool.size" in the flattened index.
+        With type, the value is converted (bools also accept "true"/"false" style strings)."""
+        value = self._index.get(key, _MISSING)
+        if value is _MISSING:
+            return default
+        return _coerce(value, type)
+
+    def accessor(self, path: str, default=None, type=None) -> ConfigAccessor:
+        """Handle that resolves path once per load; call it to read the current value"""
+        return ConfigAccessor(self, path, default, type)
     
 
@@ -1,4 +1,8 @@
+import asyncio
+import threading
+import time
 from abc import ABC, abstractmethod
+from typing import Any, Dict, Iterable, List, NamedTuple, Optional, Tuple
 
 # Strategy Pattern Code Copyrights 2025 by Vishal Chaurasiya
 
@@ -23,6 +27,20 @@ class PaymentProcessor(ABC):
         """
         raise NotImplementedError
 
+    async def process_payment_async(self, amount: float) -> str:
+        """
+        Asynchronous variant of process_payment used by the batch APIs.
+        The default runs process_payment in a worker thread; processors backed by an
+        async client should override it.
+
+        Args:
+            amount (float): The amount to be processed.
+
+        Returns:
+            str: A string indicating the payment processing status or details.
+        """
+        return await asyncio.to_thread(self.process_payment, amount)
+
 
 class PaytmProcessor(PaymentProcessor):
     """
@@ -60,27 +78,130 @@ class GooglePayProcessor(PaymentProcessor):
         return f"Processing payment via Google Pay for {amount:.2f}"
 
 
+class PaymentResult(NamedTuple):
+    """
+    Outcome of one payment in a batch. Exactly one of result and error is set.
+    """
+
+    processor: Any
+    amount: float
+    result: Optional[str] = None
+    error: Optional[BaseException] = None
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+
+class RateLimiter:
+    """
+    Token bucket allowing `rate` payments per second, with bursts of up to `burst`.
+    Safe to share between threads and event loops.
+    """
+
+    def __init__(self, rate: float, burst: Optional[int] = None):
+        if rate <= 0:
+            raise ValueError("rate must be positive")
+        self.rate = rate
+        self.burst = burst or max(1, int(rate))
+        self._tokens = float(self.burst)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _reserve(self) -> float:
+        """
+        Takes a token, going into debt when none is left.
+
+        Returns:
+            float: Seconds the caller must wait before using the token.
+        """
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            self._tokens -= 1
+            return 0.0 if self._tokens >= 0 else -self._tokens / self.rate
+
+    def acquire(self):
+        delay = self._reserve()
+        if delay:
+            time.sleep(delay)
+
+    async def acquire_async(self):
+        delay = self._reserve()
+        if delay:
+            await asyncio.sleep(delay)
+
+
 class PaymentStrategy:
     """
     Strategy to invoke payment processing based on the chosen payment processor.
     This class acts as the context for the Strategy design pattern.
+
+    Args:
+        max_concurrency (int): Most payments in flight at once in the batch APIs.
+        rate_limits (dict): Payments per second, keyed by processor class (shared by all
+                            its instances) or by processor instance.
+        idempotency_cache: Optional IdempotencyCache (payment_idempotency.py); payments
+                           given an idempotency key then run at most once per key.
     """
 
-    def __init__(self):
+    def __init__(
+        self,
+        max_concurrency: int = 16,
+        rate_limits: Optional[Dict[Any, float]] = None,
+        idempotency_cache=None,
+    ):
         # In a real-world scenario, you might have a dictionary
         # mapping payment types (e.g., 'paytm', 'googlepay') to processor instances.
-        pass
+        self.max_concurrency = max_concurrency
+        self.idempotency_cache = idempotency_cache
+        self._rate_limiters: Dict[Any, RateLimiter] = {}
+        for target, rate in (rate_limits or {}).items():
+            self.set_rate_limit(target, rate)
+
+    def set_rate_limit(self, target: Any, rate: Optional[float], burst: Optional[int] = None):
+        """
+        Limits payments through a processor class or instance; rate None removes the limit.
+        """
+        if rate is None:
+            self._rate_limiters.pop(target, None)
+        else:
+            self._rate_limiters[target] = RateLimiter(rate, burst)
+
+    def _rate_limiter(self, payment_processor: PaymentProcessor) -> Optional[RateLimiter]:
+        limiter = self._rate_limiters.get(payment_processor)
+        return limiter if limiter is not None else self._rate_limiters.get(type(payment_processor))
+
+    def _process(self, payment_processor: PaymentProcessor, amount: float, idempotency_key: Optional[str]) -> str:
+        if idempotency_key is None or self.idempotency_cache is None:
+            return payment_processor.process_payment(amount)
+        return self.idempotency_cache.execute(
+            idempotency_key, "payment", amount, payment_processor.process_payment, amount
+        )
+
+    async def _process_async(
+        self, payment_processor: PaymentProcessor, amount: float, idempotency_key: Optional[str]
+    ) -> str:
+        if idempotency_key is None or self.idempotency_cache is None:
+            return await payment_processor.process_payment_async(amount)
+        return await self.idempotency_cache.execute_async(
+            idempotency_key, "payment", amount, payment_processor.process_payment_async, amount
+        )
 
     def initiate_payment(
-        self, payment_processor: PaymentProcessor, amount: float
+        self, payment_processor: PaymentProcessor, amount: float, idempotency_key: Optional[str] = None
     ) -> str:
         """
-        Initiates a payment using the provided payment processor.
+        Initiates a payment using the provided payment processor, blocking while the
+        processor's rate limit is exhausted.
 
         Args:
             payment_processor (PaymentProcessor): An instance of a concrete
                                                   payment processor (e.g., PaytmProcessor).
             amount (float): The amount to be paid.
+            idempotency_key (str): Retries sharing this key run the processor once
+                                   (requires an idempotency_cache).
 
         Returns:
             str: The result message from the payment processor.
@@ -89,8 +210,107 @@ class PaymentStrategy:
             raise TypeError(
                 "payment_processor must be an instance of PaymentProcessor or its subclass."
             )
+        limiter = self._rate_limiter(payment_processor)
+        if limiter is not None:
+            limiter.acquire()
+        return self._process(payment_processor, amount, idempotency_key)
 
-        return payment_processor.process_payment(amount)
+    async def initiate_payment_async(
+        self, payment_processor: PaymentProcessor, amount: float, idempotency_key: Optional[str] = None
+    ) -> str:
+        """
+        Asynchronous initiate_payment, honouring the processor's rate limit.
+        """
+        if not isinstance(payment_processor, PaymentProcessor):
+            raise TypeError(
+                "payment_processor must be an instance of PaymentProcessor or its subclass."
+            )
+        limiter = self._rate_limiter(payment_processor)
+        if limiter is not None:
+            await limiter.acquire_async()
+        return await self._process_async(payment_processor, amount, idempotency_key)
+
+    async def initiate_batch_async(
+        self,
+        payments: Iterable[Tuple],
+        max_concurrency: Optional[int] = None,
+    ) -> List[PaymentResult]:
+        """
+        Processes many (processor, amount) or (processor, amount, idempotency_key) tuples
+        concurrently.
+
+        Payments are grouped by processor, so the type check and rate-limiter lookup run
+        once per processor. Each group drains through its own lane of workers, and a
+        shared semaphore caps the total in flight. A lane waits for its rate limiter before
+        taking a slot, so a throttled processor does not hold slots the others could use.
+
+        Args:
+            payments: (processor, amount) pairs, optionally with an idempotency key.
+            max_concurrency (int): Overrides the strategy's limit for this batch.
+
+        Returns:
+            List[PaymentResult]: One result per payment, in input order. Failures, including
+                                 malformed payment tuples, are reported in PaymentResult.error
+                                 instead of being raised.
+        """
+        payments = list(payments)
+        limit = max_concurrency or self.max_concurrency
+        results: List[Optional[PaymentResult]] = [None] * len(payments)
+        groups: Dict[int, List[int]] = {}
+        for i, payment in enumerate(payments):
+            try:
+                payment_processor, amount, *key = payment
+                if len(key) > 1:
+                    raise ValueError
+            except (TypeError, ValueError):
+                error = ValueError(
+                    f"Malformed payment {payment!r}; expected (processor, amount[, idempotency_key])"
+                )
+                results[i] = PaymentResult(None, None, error=error)
+                continue
+            groups.setdefault(id(payment_processor), []).append(i)
+
+        slots = asyncio.Semaphore(limit)
+
+        async def lane(pending: List[int], limiter: Optional[RateLimiter]):
+            while pending:
+                i = pending.pop()
+                payment_processor, amount, *key = payments[i]
+                if limiter is not None:
+                    await limiter.acquire_async()
+                async with slots:
+                    try:
+                        result = await self._process_async(payment_processor, amount, key[0] if key else None)
+                    except Exception as e:
+                        results[i] = PaymentResult(payment_processor, amount, error=e)
+                    else:
+                        results[i] = PaymentResult(payment_processor, amount, result)
+
+        lanes = []
+        for indices in groups.values():
+            payment_processor = payments[indices[0]][0]
+            if not isinstance(payment_processor, PaymentProcessor):
+                error = TypeError(
+                    "payment_processor must be an instance of PaymentProcessor or its subclass."
+                )
+                for i in indices:
+                    results[i] = PaymentResult(payment_processor, payments[i][1], error=error)
+                continue
+            limiter = self._rate_limiter(payment_processor)
+            pending = indices[::-1]  # popped from the end, so payments start in input order
+            lanes.extend(lane(pending, limiter) for _ in range(min(limit, len(indices))))
+        await asyncio.gather(*lanes)
+        return results
+
+    def initiate_batch(
+        self,
+        payments: Iterable[Tuple],
+        max_concurrency: Optional[int] = None,
+    ) -> List[PaymentResult]:
+        """
+        Synchronous initiate_batch_async, for callers outside an event loop.
+        """
+        return asyncio.run(self.initiate_batch_async(payments, max_concurrency))
 
 
 # Client Code
@@ -0,0 +1,174 @@
+"""
+Benchmarks for the autograd engine in temp.py.
+
+Each workload builds a graph, times forward and backward separately and records peak
+memory with tracemalloc. Results can be saved as a JSON baseline and later runs compared
+against it, failing when any metric regresses past the threshold.
+
+Usage:
+    python autograd_benchmark.py --save-baseline autograd_baseline.json
+    python autograd_benchmark.py --baseline autograd_baseline.json --threshold 0.2
+"""
+import argparse
+import json
+import statistics
+import sys
+import time
+import tracemalloc
+
+import numpy as np
+
+from temp import Tensor
+
+
+def scalar_graph(size):
+    """size repetitions of out = sin(x*y) + 5 on scalars"""
+    x = Tensor(2.0, requires_grad=True)
+    y = Tensor(3.0, requires_grad=True)
+    outs = [(x * y).sin() + 5 for _ in range(size)]
+    return outs, 3 * size
+
+
+def deep_chain(size):
+    """A single chain of size alternating Mul/Add ops"""
+    x = Tensor(1.0, requires_grad=True)
+    out = x
+    for _ in range(size // 2):
+        out = out * 1.0001 + 0.0001
+    return [out], size
+
+
+def wide_fanout(size):
+    """One input feeding size independent branches that are summed back together"""
+    x = Tensor(np.ones(16), requires_grad=True)
+    out = x.sin()
+    for i in range(size):
+        out = out + x * float(i)
+    return [out.sum()], 2 * size + 2
+
+
+def large_elementwise(size):
+    """A short elementwise graph over arrays of size elements"""
+    x = Tensor(np.linspace(0.0, 1.0, size), requires_grad=True)
+    y = Tensor(np.linspace(1.0, 2.0, size), requires_grad=True)
+    out = ((x * y).sin() + x * x).mean()
+    return [out], 5
+
+
+WORKLOADS = {
+    "scalar_graph": (scalar_graph, 2_000),
+    "deep_chain": (deep_chain, 20_000),
+    "wide_fanout": (wide_fanout, 5_000),
+    "large_elementwise": (large_elementwise, 2_000_000),
+}
+
+
+def _run_once(build, size):
+    start = time.perf_counter()
+    outs, n_ops = build(size)
+    mid = time.perf_counter()
+    for out in outs:
+        out.backward()
+    end = time.perf_counter()
+    return mid - start, end - mid, n_ops
+
+
+def _peak_memory(build, size):
+    tracemalloc.start()
+    try:
+        outs, _ = build(size)
+        for out in outs:
+            out.backward()
+        del outs
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def run_benchmarks(names=None, repeat=5, scale=1.0):
+    results = {}
+    for name in names or WORKLOADS:
+        build, size = WORKLOADS[name]
+        size = max(1, int(size * scale))
+        _run_once(build, size)  # warm-up
+        forward, backward = [], []
+        for _ in range(repeat):
+            fwd, bwd, n_ops = _run_once(build, size)
+            forward.append(fwd)
+            backward.append(bwd)
+        fwd, bwd = statistics.median(forward), statistics.median(backward)
+        results[name] = {
+            "size": size,
+            "ops": n_ops,
+            "forward_s": fwd,
+            "backward_s": bwd,
+            "forward_ops_per_s": n_ops / fwd,
+            "backward_ops_per_s": n_ops / bwd,
+            "peak_bytes": _peak_memory(build, size),
+        }
+    return results
+
+
+# Metrics where a larger value is a regression
+REGRESSION_METRICS = ("forward_s", "backward_s", "peak_bytes")
+
+
+def compare(results, baseline, threshold):
+    """Returns a message for every metric more than threshold (a fraction) worse than baseline"""
+    failures = []
+    for name, result in results.items():
+        base = baseline.get(name)
+        if base is None or base.get("size") != result["size"]:
+            continue
+        for metric in REGRESSION_METRICS:
+            if base[metric] > 0 and result[metric] > base[metric] * (1 + threshold):
+                change = result[metric] / base[metric] - 1
+                failures.append(f"{name}.{metric}: {base[metric]:.6g} -> {result[metric]:.6g} "
+                                f"(+{change:.1%}, threshold {threshold:.0%})")
+    return failures
+
+
+def format_results(results):
+    header = f"{'Workload':<20}{'Ops':>8}{'Fwd ms':>10}{'Bwd ms':>10}{'Bwd ops/s':>14}{'Peak KiB':>12}"
+    rows = [header, "-" * len(header)]
+    for name, r in results.items():
+        rows.append(f"{name:<20}{r['ops']:>8}{r['forward_s'] * 1e3:>10.2f}{r['backward_s'] * 1e3:>10.2f}"
+                    f"{r['backward_ops_per_s']:>14.0f}{r['peak_bytes'] / 1024:>12.1f}")
+    return "\n".join(rows)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the temp.py autograd engine")
+    parser.add_argument("--workload", action="append", choices=sorted(WORKLOADS),
+                        help="run only this workload (repeatable)")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--scale", type=float, default=1.0, help="multiplier for workload sizes")
+    parser.add_argument("--save-baseline", metavar="PATH", help="write results as a JSON baseline")
+    parser.add_argument("--baseline", metavar="PATH", help="compare against a JSON baseline")
+    parser.add_argument("--threshold", type=float, default=0.2,
+                        help="allowed regression as a fraction of the baseline (default 0.2)")
+    args = parser.parse_args(argv)
+
+    results = run_benchmarks(args.workload, args.repeat, args.scale)
+    print(format_results(results))
+
+    if args.save_baseline:
+        with open(args.save_baseline, "w") as f:
+            json.dump(results, f, indent=2)
+        print(f"\nBaseline written to {args.save_baseline}")
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        failures = compare(results, baseline, args.threshold)
+        if failures:
+            print("\nRegressions:")
+            for failure in failures:
+                print(f"  {failure}")
+            return 1
+        print("\nNo regressions against baseline")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,275 @@
+"""
+Load benchmark for the factory and strategy payment paths against local mock providers.
+
+Mock processors sleep for a configurable latency with jitter and fail at a configurable
+rate, so runs are reproducible without a real provider. The strategy path drives
+PaymentStrategy (initiate_payment, initiate_payment_async or initiate_batch). The factory
+path drives client_code, with a fresh processor per payment or pooled through the
+FactoryRegistry. Each run reports throughput, latency percentiles and the error count, so the
+batching, pooling, idempotency and resilience options can be compared under the same load.
+
+Modes:
+    sync       one payment at a time on the calling thread
+    threaded   --concurrency worker threads
+    asyncio    --concurrency payments in flight on one event loop
+    batch      PaymentStrategy.initiate_batch in chunks of --batch (strategy path only)
+
+Usage:
+    python payment_benchmark.py --path strategy --mode asyncio --payments 5000 --latency 0.005
+    python payment_benchmark.py --path factory --mode threaded --setup-cost 0.002 --pooled
+    python payment_benchmark.py --path strategy --mode threaded --duplicates 0.3 --idempotency
+"""
+import argparse
+import asyncio
+import contextlib
+import io
+import json
+import os
+import random
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Optional
+
+_ROOT = os.path.dirname(os.path.abspath(__file__))
+# The pattern folders are flat script directories rather than packages
+sys.path[:0] = [os.path.join(_ROOT, "Strategy_Pattern"), os.path.join(_ROOT, "Factory_Pattern")]
+
+import startegy_pattern as strategy  # noqa: E402
+
+with contextlib.redirect_stdout(io.StringIO()):  # the module runs a demo payment on import
+    import factory_pattern as factory  # noqa: E402
+
+from payment_idempotency import IdempotencyCache  # noqa: E402
+from payment_resilience import ResilientFactory, ResilientProcessor  # noqa: E402
+
+
+class MockProviderError(RuntimeError):
+    """Injected provider failure"""
+
+
+class MockProcessor(strategy.PaymentProcessor, factory.PaymentProcessor):
+    """
+    Local stand-in for a provider: each call takes latency +/- jitter seconds and fails with
+    probability error_rate. Implements both the strategy and the factory processor interfaces.
+    """
+
+    def __init__(self, latency: float = 0.002, jitter: float = 0.0, error_rate: float = 0.0,
+                 seed: Optional[int] = None):
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self._rng = random.Random(seed)
+        self._rng_lock = threading.Lock()
+
+    def _draw(self):
+        with self._rng_lock:
+            delay = max(0.0, self._rng.uniform(self.latency - self.jitter, self.latency + self.jitter))
+            failed = self._rng.random() < self.error_rate
+        return delay, failed
+
+    def process_payment(self, amount: float) -> str:
+        delay, failed = self._draw()
+        time.sleep(delay)
+        if failed:
+            raise MockProviderError(f"Mock provider declined {amount:.2f}")
+        return f"Processed {amount:.2f}"
+
+    async def process_payment_async(self, amount: float) -> str:
+        delay, failed = self._draw()
+        await asyncio.sleep(delay)
+        if failed:
+            raise MockProviderError(f"Mock provider declined {amount:.2f}")
+        return f"Processed {amount:.2f}"
+
+    def refund_payment(self, amount: float) -> str:
+        return self.process_payment(amount)
+
+
+class ResilientStrategyProcessor(ResilientProcessor, strategy.PaymentProcessor):
+    """ResilientProcessor that passes PaymentStrategy's PaymentProcessor type check"""
+
+
+class MockFactory(factory.PaymentProcessorFactory):
+    """Builds MockProcessors, paying setup_cost seconds per construction like a TLS handshake"""
+
+    def __init__(self, setup_cost: float = 0.0, **processor_options):
+        self.setup_cost = setup_cost
+        self.processor_options = processor_options
+
+    def create_processor(self) -> MockProcessor:
+        if self.setup_cost:
+            time.sleep(self.setup_cost)
+        return MockProcessor(**self.processor_options)
+
+
+def _workload(payments: int, duplicates: float, seed: int):
+    """(amount, idempotency_key) pairs; a `duplicates` fraction replays an earlier key like a retry"""
+    rng = random.Random(seed)
+    work = []
+    for i in range(payments):
+        if work and rng.random() < duplicates:
+            work.append(work[rng.randrange(len(work))])
+        else:
+            work.append((round(rng.uniform(1.0, 500.0), 2), f"payment-{i}"))
+    return work
+
+
+def _percentile(sorted_values: List[float], q: float) -> float:
+    if not sorted_values:
+        return 0.0
+    return sorted_values[min(len(sorted_values) - 1, int(q * len(sorted_values)))]
+
+
+def build_caller(args):
+    """Returns (call, call_async) running one (amount, key) payment on the chosen path"""
+    cache = IdempotencyCache(max_entries=max(1, args.payments)) if args.idempotency else None
+    options = dict(latency=args.latency, jitter=args.jitter, error_rate=args.error_rate)
+
+    if args.path == "strategy":
+        processor = MockProcessor(seed=args.seed, **options)
+        if args.timeout:
+            processor = ResilientStrategyProcessor(processor, timeout=args.timeout, hedge_percentile=None)
+        payment_strategy = strategy.PaymentStrategy(max_concurrency=args.concurrency, idempotency_cache=cache)
+
+        def call(amount, key):
+            return payment_strategy.initiate_payment(processor, amount, key if cache else None)
+
+        async def call_async(amount, key):
+            return await payment_strategy.initiate_payment_async(processor, amount, key if cache else None)
+
+        call.strategy, call.processor = payment_strategy, processor
+        return call, call_async
+
+    mock_factory = MockFactory(args.setup_cost, **options)
+    if args.timeout:
+        mock_factory = ResilientFactory(mock_factory, timeout=args.timeout, hedge_percentile=None)
+    # client_code leases by name from the module-level registry
+    registry = factory.registry
+    if "mock" in registry.names():
+        registry.unregister("mock")
+    registry.register("mock", mock_factory, max_size=args.concurrency)
+    target = "mock" if args.pooled else mock_factory
+
+    def call(amount, key):
+        return factory.client_code(target, amount, key, cache)
+
+    async def call_async(amount, key):
+        return await asyncio.to_thread(call, amount, key)
+
+    call.registry = registry
+    return call, call_async
+
+
+def run(args) -> dict:
+    work = _workload(args.payments, args.duplicates, args.seed)
+    call, call_async = build_caller(args)
+    latencies: List[float] = []
+    failures: List[Exception] = []  # list.append is atomic, so worker threads need no lock
+    clock = time.perf_counter
+
+    def timed(amount, key):
+        t0 = clock()
+        try:
+            call(amount, key)
+        except Exception as e:
+            failures.append(e)
+        latencies.append(clock() - t0)
+
+    started = clock()
+    if args.mode == "sync":
+        for amount, key in work:
+            timed(amount, key)
+    elif args.mode == "threaded":
+        with ThreadPoolExecutor(max_workers=args.concurrency) as pool:
+            for _ in pool.map(lambda item: timed(*item), work):
+                pass
+    elif args.mode == "asyncio":
+        async def drive():
+            slots = asyncio.Semaphore(args.concurrency)
+
+            async def one(amount, key):
+                async with slots:
+                    t0 = clock()
+                    try:
+                        await call_async(amount, key)
+                    except Exception as e:
+                        failures.append(e)
+                    latencies.append(clock() - t0)
+
+            await asyncio.gather(*(one(amount, key) for amount, key in work))
+
+        asyncio.run(drive())
+    else:
+        if args.path != "strategy":
+            raise SystemExit("batch mode drives PaymentStrategy.initiate_batch; use --path strategy")
+        for i in range(0, len(work), args.batch):
+            chunk = [(call.processor, amount, key) for amount, key in work[i:i + args.batch]]
+            t0 = clock()
+            results = call.strategy.initiate_batch(chunk)
+            latencies.append(clock() - t0)
+            failures.extend(result.error for result in results if not result.ok)
+    elapsed = clock() - started
+
+    latencies.sort()
+    result = {
+        "path": args.path,
+        "mode": args.mode,
+        "payments": len(work),
+        "errors": len(failures),
+        "seconds": elapsed,
+        "payments_per_s": len(work) / elapsed if elapsed else 0.0,
+        "p50_ms": _percentile(latencies, 0.50) * 1e3,
+        "p95_ms": _percentile(latencies, 0.95) * 1e3,
+        "p99_ms": _percentile(latencies, 0.99) * 1e3,
+        "latency_unit": f"per batch of {args.batch}" if args.mode == "batch" else "per payment",
+    }
+    if args.path == "factory" and args.pooled:
+        result["pool"] = call.registry.metrics()["mock"]._asdict()
+    return result
+
+
+def format_report(result: dict) -> str:
+    lines = [
+        f"Path / mode : {result['path']} / {result['mode']}",
+        f"Payments    : {result['payments']} ({result['errors']} errors)",
+        f"Throughput  : {result['payments_per_s']:,.0f} payments/s ({result['seconds']:.3f}s)",
+        f"Latency     : p50 {result['p50_ms']:.2f}ms, p95 {result['p95_ms']:.2f}ms, "
+        f"p99 {result['p99_ms']:.2f}ms ({result['latency_unit']})",
+    ]
+    if "pool" in result:
+        pool = result["pool"]
+        lines.append(f"Pool        : {pool['created']} created, {pool['reused']} reused, {pool['waits']} waits")
+    return "\n".join(lines)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark payment paths against mock providers")
+    parser.add_argument("--path", choices=("strategy", "factory"), default="strategy")
+    parser.add_argument("--mode", choices=("sync", "threaded", "asyncio", "batch"), default="sync")
+    parser.add_argument("--payments", type=int, default=2_000)
+    parser.add_argument("--concurrency", type=int, default=32, help="threads, tasks or pool size")
+    parser.add_argument("--batch", type=int, default=500, help="payments per initiate_batch call")
+    parser.add_argument("--latency", type=float, default=0.002, help="mock provider latency in seconds")
+    parser.add_argument("--jitter", type=float, default=0.0, help="+/- seconds added uniformly to latency")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="fraction of calls that fail")
+    parser.add_argument("--setup-cost", type=float, default=0.0,
+                        help="seconds to construct a factory processor (models client setup)")
+    parser.add_argument("--pooled", action="store_true", help="factory path: lease from a ProcessorPool")
+    parser.add_argument("--duplicates", type=float, default=0.0,
+                        help="fraction of payments that retry an earlier idempotency key")
+    parser.add_argument("--idempotency", action="store_true", help="route keys through an IdempotencyCache")
+    parser.add_argument("--timeout", type=float, default=0.0,
+                        help="wrap processors in ResilientProcessor with this timeout (0 = off)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", action="store_true", help="print the result as JSON")
+    args = parser.parse_args(argv)
+
+    result = run(args)
+    print(json.dumps(result, indent=2) if args.json else format_report(result))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
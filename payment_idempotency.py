@@ -0,0 +1,268 @@
+"""
+Idempotency-key layer for payment processors.
+
+Retries of a payment or refund carry the same idempotency key. The first call with a key
+runs the processor. Concurrent duplicates wait for that call instead of starting their own,
+and later duplicates are answered from an LRU+TTL result cache. A key reused for a different
+operation or amount raises IdempotencyConflict. Failed calls are not cached, so a retry after
+an error runs again.
+
+The layer is duck-typed and works with the processors in Factory_Pattern and Strategy_Pattern.
+IdempotentProcessor wraps one processor, and PaymentStrategy and client_code accept a cache
+directly. With a path, completed results are journalled to disk as JSON lines and reloaded on
+start, so duplicates are caught across restarts.
+
+Usage:
+    cache = IdempotencyCache(max_entries=100_000, ttl=24 * 3600, path="idempotency.jsonl")
+    paytm = IdempotentProcessor(PaytmProcessor(), cache)
+    paytm.process_payment(299, idempotency_key="order-42")
+    paytm.process_payment(299, idempotency_key="order-42")   # cached, processor not called
+"""
+import asyncio
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future
+from typing import Any, Callable, Optional, Tuple
+
+
+class IdempotencyConflict(ValueError):
+    """An idempotency key was reused for a different operation or amount"""
+
+
+_HIT, _WAIT, _LEAD = range(3)
+
+
+class IdempotencyCache:
+    """
+    LRU+TTL cache of results keyed by idempotency key, with in-flight duplicate collapsing.
+
+    Args:
+        max_entries (int): Results kept; the least recently used are dropped first.
+        ttl (float): Seconds a result stays valid after it was produced.
+        path (str): Optional JSON-lines journal used to persist results across restarts.
+                    Results that are not JSON-serialisable are only kept in memory.
+        fsync (bool): fsync the journal after every write, for durability over throughput.
+    """
+
+    def __init__(self, max_entries: int = 10_000, ttl: float = 24 * 3600.0,
+                 path: Optional[str] = None, fsync: bool = False):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries: "OrderedDict[str, Tuple[list, Any, float]]" = OrderedDict()
+        self._inflight = {}
+        self._lock = threading.Lock()
+        self.hits = self.misses = self.collapsed = 0
+        self._path = path
+        self._fsync = fsync
+        self._journal = None
+        self._journal_lock = threading.Lock()
+        self._journal_lines = 0
+        if path is not None:
+            self._load(path)
+            self._journal = open(path, "a", encoding="utf-8")
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _claim(self, key: str, fingerprint: list):
+        """Returns (_HIT, result), (_WAIT, future) or (_LEAD, future) for this call"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                if entry[2] > time.time():
+                    if entry[0] != fingerprint:
+                        raise IdempotencyConflict(f"Key {key!r} was used for {entry[0]}, not {fingerprint}")
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return _HIT, entry[1]
+                del self._entries[key]
+            inflight = self._inflight.get(key)
+            if inflight is not None:
+                if inflight[0] != fingerprint:
+                    raise IdempotencyConflict(f"Key {key!r} is in flight for {inflight[0]}, not {fingerprint}")
+                self.collapsed += 1
+                return _WAIT, inflight[1]
+            future = Future()
+            self._inflight[key] = (fingerprint, future)
+            self.misses += 1
+            return _LEAD, future
+
+    def _complete(self, key: str, fingerprint: list, future: Future, result: Any):
+        expires = time.time() + self.ttl
+        with self._lock:
+            del self._inflight[key]
+            self._store(key, fingerprint, result, expires)
+        if not future.cancelled():
+            future.set_result(result)
+        self._persist(key, fingerprint, result, expires)
+
+    def _fail(self, key: str, future: Future, error: BaseException):
+        with self._lock:
+            del self._inflight[key]
+        if not future.cancelled():
+            future.set_exception(error)
+
+    def _store(self, key: str, fingerprint: list, result: Any, expires: float):
+        self._entries[key] = (fingerprint, result, expires)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def execute(self, key: str, operation: str, amount: float, call: Callable, *args, **kwargs):
+        """Runs call(*args, **kwargs) once per key; duplicates get the same result or exception"""
+        fingerprint = [operation, amount]
+        state, value = self._claim(key, fingerprint)
+        if state == _HIT:
+            return value
+        if state == _WAIT:
+            return value.result()
+        try:
+            result = call(*args, **kwargs)
+        except BaseException as e:
+            self._fail(key, value, e)
+            raise
+        self._complete(key, fingerprint, value, result)
+        return result
+
+    async def execute_async(self, key: str, operation: str, amount: float, call: Callable, *args, **kwargs):
+        """execute for a coroutine function; duplicates may come from other threads or loops"""
+        fingerprint = [operation, amount]
+        state, value = self._claim(key, fingerprint)
+        if state == _HIT:
+            return value
+        if state == _WAIT:
+            # Shielded: a cancelled waiter must not cancel the future the leader and other waiters share
+            return await asyncio.shield(asyncio.wrap_future(value))
+        try:
+            result = await call(*args, **kwargs)
+        except BaseException as e:
+            self._fail(key, value, e)
+            raise
+        self._complete(key, fingerprint, value, result)
+        return result
+
+    def invalidate(self, key: str):
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def _load(self, path: str):
+        if not os.path.exists(path):
+            return
+        now = time.time()
+        with open(path, encoding="utf-8") as f:
+            for line in f:
+                self._journal_lines += 1
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    continue  # torn final line from a crash
+                if record["e"] > now:
+                    self._store(record["k"], record["f"], record["r"], record["e"])
+                else:
+                    self._entries.pop(record["k"], None)
+
+    def _persist(self, key: str, fingerprint: list, result: Any, expires: float):
+        if self._journal is None:
+            return
+        try:
+            line = json.dumps({"k": key, "f": fingerprint, "r": result, "e": expires})
+        except (TypeError, ValueError):
+            return
+        with self._journal_lock:
+            self._journal.write(line + "\n")
+            self._journal.flush()
+            if self._fsync:
+                os.fsync(self._journal.fileno())
+            self._journal_lines += 1
+            if self._journal_lines > 2 * self.max_entries:
+                self._compact()
+
+    def _compact(self):
+        """Rewrites the journal with only the live entries; caller holds the journal lock"""
+        with self._lock:
+            entries = list(self._entries.items())
+        tmp = self._path + ".tmp"
+        lines = 0
+        with open(tmp, "w", encoding="utf-8") as f:
+            for key, (fingerprint, result, expires) in entries:
+                try:
+                    f.write(json.dumps({"k": key, "f": fingerprint, "r": result, "e": expires}) + "\n")
+                    lines += 1
+                except (TypeError, ValueError):
+                    continue
+            f.flush()
+            os.fsync(f.fileno())
+        self._journal.close()
+        os.replace(tmp, self._path)
+        self._journal = open(self._path, "a", encoding="utf-8")
+        self._journal_lines = lines
+
+    def close(self):
+        with self._journal_lock:
+            if self._journal is not None:
+                self._journal.close()
+                self._journal = None
+
+
+class IdempotentProcessor:
+    """
+    Wraps a payment processor so that calls carrying an idempotency_key go through an
+    IdempotencyCache. Calls without a key pass straight through. Other attributes are
+    forwarded to the wrapped processor.
+
+    Args:
+        processor: Any object with process_payment and, optionally, refund_payment.
+        cache (IdempotencyCache): Cache shared by every processor that should see the same keys.
+    """
+
+    def __init__(self, processor, cache: IdempotencyCache):
+        self.processor = processor
+        self.cache = cache
+
+    def process_payment(self, amount: float, idempotency_key: Optional[str] = None):
+        if idempotency_key is None:
+            return self.processor.process_payment(amount)
+        return self.cache.execute(idempotency_key, "payment", amount, self.processor.process_payment, amount)
+
+    def refund_payment(self, amount: float, idempotency_key: Optional[str] = None):
+        if idempotency_key is None:
+            return self.processor.refund_payment(amount)
+        return self.cache.execute(idempotency_key, "refund", amount, self.processor.refund_payment, amount)
+
+    async def process_payment_async(self, amount: float, idempotency_key: Optional[str] = None):
+        call = getattr(self.processor, "process_payment_async", None)
+        if call is None:
+            call = lambda value: asyncio.to_thread(self.processor.process_payment, value)
+        if idempotency_key is None:
+            return await call(amount)
+        return await self.cache.execute_async(idempotency_key, "payment", amount, call, amount)
+
+    def __getattr__(self, name):
+        return getattr(self.processor, name)
+
+
+if __name__ == "__main__":
+    # Regression check: a duplicate that times out while the leader is still running must not
+    # cancel the shared in-flight future for the leader or the other duplicates
+    async def slow_payment(amount):
+        await asyncio.sleep(0.1)
+        return f"Processed {amount:.2f}"
+
+    async def main():
+        cache = IdempotencyCache()
+        leader = asyncio.ensure_future(cache.execute_async("order-1", "payment", 10.0, slow_payment, 10.0))
+        await asyncio.sleep(0)
+        waiter = asyncio.ensure_future(cache.execute_async("order-1", "payment", 10.0, slow_payment, 10.0))
+        try:
+            await asyncio.wait_for(cache.execute_async("order-1", "payment", 10.0, slow_payment, 10.0), 0.01)
+        except asyncio.TimeoutError:
+            pass
+        results = [await leader, await waiter]
+        assert results == ["Processed 10.00"] * 2, results
+        assert cache.execute("order-1", "payment", 10.0, lambda: "not called") == "Processed 10.00"
+        print("Timed-out duplicate left the leader and other waiters intact:", results)
+
+    asyncio.run(main())
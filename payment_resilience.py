@@ -0,0 +1,328 @@
+"""
+Timeouts, circuit breaking and hedged requests for payment processors.
+
+ResilientProcessor wraps any object with process_payment (and optionally refund_payment or
+process_payment_async), such as the processors in Factory_Pattern and Strategy_Pattern, and
+keeps a slow provider from stalling its callers:
+
+    timeout     every call gives up after `timeout` seconds with TimeoutError
+    breaker     after `failure_threshold` consecutive failures or timeouts the circuit opens;
+                calls fail fast (or go to the secondary) until one probe succeeds after
+                `recovery_time` seconds
+    hedging     when a payment has not completed within the primary's recent latency
+                percentile, the same payment is also sent to the secondary and the first
+                success wins; a primary error fails over to the secondary straight away
+
+Hedging runs one payment through two providers, so only enable it when a duplicate is
+harmless, e.g. authorisation-only flows or processors sharing an IdempotencyCache key.
+Refunds get the timeout and breaker but never hedge or fail over to the secondary.
+
+Synchronous calls run in a thread pool so they can be abandoned at the timeout. An
+abandoned call keeps its worker until the processor returns. Async calls cancel the losing
+or timed-out task.
+
+Usage:
+    class ResilientPayment(ResilientProcessor, PaymentProcessor):   # passes PaymentStrategy's type check
+        pass
+
+    paytm = ResilientPayment(PaytmProcessor(), timeout=2.0, secondary=GooglePayProcessor())
+    PaymentStrategy().initiate_payment(paytm, 299)
+"""
+import asyncio
+import concurrent.futures
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Optional
+
+
+class CircuitOpenError(RuntimeError):
+    """The processor's circuit is open and there is no secondary to fall back to"""
+
+
+class CircuitBreaker:
+    """
+    Consecutive-failure circuit breaker, shareable between every wrapper of one backend.
+
+    Args:
+        failure_threshold (int): Consecutive failures that open the circuit.
+        recovery_time (float): Seconds the circuit stays open before a single probe call is let through.
+    """
+
+    CLOSED, OPEN, HALF_OPEN = "closed", "open", "half_open"
+
+    def __init__(self, failure_threshold: int = 5, recovery_time: float = 30.0):
+        self.failure_threshold = failure_threshold
+        self.recovery_time = recovery_time
+        self._state = self.CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._probing = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self) -> str:
+        return self._state
+
+    def allow(self) -> Optional[str]:
+        """None when the call must not go to the backend, otherwise the state it was admitted in;
+        HALF_OPEN means the caller holds the single probe and must record or release it"""
+        with self._lock:
+            if self._state == self.OPEN:
+                if time.monotonic() - self._opened_at < self.recovery_time:
+                    return None
+                self._state = self.HALF_OPEN
+                self._probing = False
+            if self._state == self.HALF_OPEN:
+                if self._probing:
+                    return None
+                self._probing = True
+            return self._state
+
+    def record_success(self):
+        with self._lock:
+            self._failures = 0
+            self._state = self.CLOSED
+            self._probing = False
+
+    def record_failure(self):
+        with self._lock:
+            self._failures += 1
+            if self._state == self.HALF_OPEN or self._failures >= self.failure_threshold:
+                self._state = self.OPEN
+                self._opened_at = time.monotonic()
+                self._probing = False
+
+    def release_probe(self):
+        """Lets another probe through after one ended without an outcome, e.g. was cancelled"""
+        with self._lock:
+            if self._state == self.HALF_OPEN:
+                self._probing = False
+
+
+class LatencyTracker:
+    """Latencies of the most recent `window` calls, for the hedging percentile"""
+
+    def __init__(self, window: int = 256, min_samples: int = 20):
+        self._samples = deque(maxlen=window)
+        self.min_samples = min_samples
+
+    def record(self, seconds: float):
+        self._samples.append(seconds)
+
+    def percentile(self, q: float) -> Optional[float]:
+        """None until min_samples calls have been seen"""
+        samples = sorted(self._samples)
+        if len(samples) < self.min_samples:
+            return None
+        return samples[min(len(samples) - 1, int(q * len(samples)))]
+
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def _default_executor() -> ThreadPoolExecutor:
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=32, thread_name_prefix="payment")
+        return _executor
+
+
+class ResilientProcessor:
+    """
+    Wraps a payment processor with a timeout, a circuit breaker and optional hedging to a
+    secondary processor. Other attributes are forwarded to the wrapped processor.
+
+    Args:
+        processor: The primary processor.
+        timeout (float): Seconds before a call fails with TimeoutError; None waits forever.
+        secondary: Processor used when the circuit is open, when the primary fails and,
+                   with hedging, when the primary is slow.
+        hedge_percentile (float): Primary latency percentile after which a payment is hedged;
+                                  None disables hedging.
+        hedge_after (float): Fixed hedge delay in seconds, used instead of the percentile.
+        breaker (CircuitBreaker): Pass one instance to every wrapper of the same backend.
+        latency (LatencyTracker): Likewise shared per backend.
+        executor: Thread pool for synchronous calls; a shared module pool by default.
+    """
+
+    def __init__(self, processor, timeout: Optional[float] = 5.0, secondary=None,
+                 hedge_percentile: Optional[float] = 0.95, hedge_after: Optional[float] = None,
+                 breaker: Optional[CircuitBreaker] = None, latency: Optional[LatencyTracker] = None,
+                 executor: Optional[ThreadPoolExecutor] = None):
+        self.processor = processor
+        self.timeout = timeout
+        self.secondary = secondary
+        self.hedge_percentile = hedge_percentile
+        self.hedge_after = hedge_after
+        self.breaker = breaker or CircuitBreaker()
+        self.latency = latency or LatencyTracker()
+        self._executor = executor
+        self.hedged = self.failovers = self.timeouts = 0
+
+    def __getattr__(self, name):
+        return getattr(self.processor, name)
+
+    def _hedge_delay(self) -> Optional[float]:
+        if self.secondary is None:
+            return None
+        if self.hedge_after is not None:
+            return self.hedge_after
+        if self.hedge_percentile is None:
+            return None
+        return self.latency.percentile(self.hedge_percentile)
+
+    def _outcome(self, started: float, failed: bool):
+        self.latency.record(time.monotonic() - started)
+        if failed:
+            self.breaker.record_failure()
+        else:
+            self.breaker.record_success()
+
+    def process_payment(self, amount: float):
+        return self._call("process_payment", amount, hedge=True)
+
+    def refund_payment(self, amount: float):
+        return self._call("refund_payment", amount, hedge=False)
+
+    def _call(self, method: str, amount: float, hedge: bool):
+        # Refunds must go back through the provider that took the payment, so they never fail over
+        secondary = getattr(self.secondary, method, None) if hedge else None
+        executor = self._executor or _default_executor()
+        if self.breaker.allow() is None:
+            if secondary is None:
+                raise CircuitOpenError(f"Circuit open for {self.processor!r}")
+            self.failovers += 1
+            try:
+                return executor.submit(secondary, amount).result(self.timeout)
+            except concurrent.futures.TimeoutError:
+                self.timeouts += 1
+                raise TimeoutError(f"{method} did not complete within {self.timeout}s") from None
+
+        started = time.monotonic()
+        deadline = None if self.timeout is None else started + self.timeout
+        primary = executor.submit(getattr(self.processor, method), amount)
+        pending = {primary}
+        delay = self._hedge_delay() if hedge else None
+        if delay is not None and (deadline is None or started + delay < deadline):
+            if not wait(pending, delay)[0]:
+                self.hedged += 1
+                pending.add(executor.submit(secondary, amount))
+                secondary = None
+
+        error = None
+        while pending:
+            remaining = None if deadline is None else deadline - time.monotonic()
+            if remaining is not None and remaining <= 0:
+                break
+            done, pending = wait(pending, remaining, return_when=FIRST_COMPLETED)
+            for future in done:
+                failed = future.exception() is not None
+                if future is primary:
+                    self._outcome(started, failed)
+                if not failed:
+                    if not primary.done():
+                        # The hedge won; the primary still counts once it finishes
+                        primary.add_done_callback(lambda f: self._outcome(started, f.exception() is not None))
+                    return future.result()
+                error = error or future.exception()
+                if future is primary and secondary is not None:
+                    self.failovers += 1
+                    pending.add(executor.submit(secondary, amount))
+                    secondary = None
+        if not pending:
+            raise error
+
+        self.timeouts += 1
+        if not primary.done():
+            self.breaker.record_failure()
+            primary.add_done_callback(lambda f: self.latency.record(time.monotonic() - started))
+        raise TimeoutError(f"{method} did not complete within {self.timeout}s")
+
+    async def process_payment_async(self, amount: float):
+        admitted = self.breaker.allow()
+        if admitted is None:
+            if self.secondary is None:
+                raise CircuitOpenError(f"Circuit open for {self.processor!r}")
+            self.failovers += 1
+            try:
+                return await asyncio.wait_for(self._start(self.secondary, amount), self.timeout)
+            except asyncio.TimeoutError:
+                self.timeouts += 1
+                raise TimeoutError(f"process_payment did not complete within {self.timeout}s") from None
+
+        loop = asyncio.get_running_loop()
+        started = loop.time()
+        deadline = None if self.timeout is None else started + self.timeout
+        primary = asyncio.ensure_future(self._start(self.processor, amount))
+        pending = {primary}
+        secondary = self.secondary
+        try:
+            delay = self._hedge_delay()
+            if delay is not None and (deadline is None or started + delay < deadline):
+                if not (await asyncio.wait(pending, timeout=delay))[0]:
+                    self.hedged += 1
+                    pending.add(asyncio.ensure_future(self._start(secondary, amount)))
+                    secondary = None
+
+            error = None
+            while pending:
+                remaining = None if deadline is None else deadline - loop.time()
+                if remaining is not None and remaining <= 0:
+                    break
+                done, pending = await asyncio.wait(pending, timeout=remaining, return_when=FIRST_COMPLETED)
+                for task in done:
+                    failed = task.exception() is not None
+                    if task is primary:
+                        self.latency.record(loop.time() - started)
+                        (self.breaker.record_failure if failed else self.breaker.record_success)()
+                    if not failed:
+                        return task.result()
+                    error = error or task.exception()
+                    if task is primary and secondary is not None:
+                        self.failovers += 1
+                        pending.add(asyncio.ensure_future(self._start(secondary, amount)))
+                        secondary = None
+            if not pending:
+                raise error
+
+            self.timeouts += 1
+            if not primary.done():
+                self.breaker.record_failure()
+            raise TimeoutError(f"process_payment did not complete within {self.timeout}s")
+        finally:
+            for task in pending:
+                task.cancel()
+            if primary in pending:
+                # Censored sample: the primary took at least this long. Skipping it would leave only
+                # fast primaries in the tracker and drag the hedge percentile down.
+                self.latency.record(loop.time() - started)
+                if admitted == CircuitBreaker.HALF_OPEN:
+                    # Cancelled before an outcome; this call's probe must not stay claimed
+                    self.breaker.release_probe()
+
+    @staticmethod
+    async def _start(processor, amount: float):
+        call = getattr(processor, "process_payment_async", None)
+        if call is not None:
+            return await call(amount)
+        return await asyncio.to_thread(processor.process_payment, amount)
+
+
+class ResilientFactory:
+    """
+    Factory decorator for Factory_Pattern: each created processor is wrapped in a
+    ResilientProcessor that shares this factory's breaker and latency tracker.
+    """
+
+    def __init__(self, factory, **options):
+        self.factory = factory
+        options.setdefault("breaker", CircuitBreaker())
+        options.setdefault("latency", LatencyTracker())
+        self.options = options
+
+    def create_processor(self) -> ResilientProcessor:
+        return ResilientProcessor(self.factory.create_processor(), **self.options)
@@ -1,3 +1,9 @@
+import json
+import os
+import threading
+import time
+import weakref
+
 import numpy as np
 
 class Context:
@@ -8,24 +14,103 @@ class Context:
     def save_for_backward(self, *args):
         self.saved_tensors.extend(args)
 
+class _NoGradContext:
+    """Shared stand-in for Context when no graph is recorded; saves and attributes are dropped"""
+    __slots__ = ()
+    
+    def save_for_backward(self, *args):
+        pass
+    
+    def __setattr__(self, name, value):
+        pass
+
+_NO_GRAD_CTX = _NoGradContext()
+
+# Graph recording switch: set_grad_enabled sets the process-wide default, no_grad overrides it
+# for the current thread only, so inference in one thread never stops another from recording
+_grad_default = True
+_grad_local = threading.local()
+
+def is_grad_enabled():
+    return getattr(_grad_local, "enabled", _grad_default)
+
+def set_grad_enabled(mode):
+    global _grad_default
+    _grad_default = bool(mode)
+    # Takes effect in the calling thread too, even inside no_grad
+    _grad_local.__dict__.pop("enabled", None)
+
+class no_grad:
+    """Context manager for inference: ops inside it skip Context creation and tensor saving.
+    Scoped to the thread that enters it."""
+    def __enter__(self):
+        self._prev = _grad_local.__dict__.get("enabled")
+        _grad_local.enabled = False
+        return self
+    
+    def __exit__(self, exc_type, exc_value, traceback):
+        if self._prev is None:
+            _grad_local.__dict__.pop("enabled", None)
+        else:
+            _grad_local.enabled = self._prev
+        return False
+
+def _drain(stack):
+    """Yields items from the end of a list, dropping each reference as it goes"""
+    while stack:
+        yield stack.pop()
+
+class _GradBuffers:
+    """Free-list of gradient arrays keyed by shape and dtype"""
+    def __init__(self):
+        self._free = {}
+    
+    def add(self, a, b):
+        """Returns a + b written into a recycled buffer when one of the right shape is free"""
+        key = (np.broadcast_shapes(np.shape(a), np.shape(b)), np.result_type(a, b))
+        free = self._free.get(key)
+        out = free.pop() if free else np.empty(*key)
+        return np.add(a, b, out=out)
+    
+    def accumulate(self, acc, g):
+        """Adds g into an engine-owned buffer in place, reallocating only if the result does not fit"""
+        try:
+            return np.add(acc, g, out=acc)
+        except (ValueError, TypeError):
+            return self.add(acc, g)
+    
+    def release(self, buf):
+        self._free.setdefault((buf.shape, buf.dtype), []).append(buf)
+
+# Active _Trace while a CompiledFunction is recording, None otherwise
+_tracer = None
+
 class Function:
     """Base class for all autograd operations"""
+    # Elementwise ufunc computing forward with out=; ops that set it can be fused by trace()
+    kernel = None
+    
     @staticmethod
     def forward(ctx, *args, **kwargs):
         raise NotImplementedError
     
     @staticmethod
     def backward(ctx, grad_output):
+        """Receives the upstream gradient as an ndarray, returns one per saved tensor"""
         raise NotImplementedError
     
     @classmethod
     def apply(cls, *args, **kwargs):
-        ctx = Context()
-        output = cls.forward(ctx, *args, **kwargs)
-        if any(isinstance(t, Tensor) and t.requires_grad for t in args):
+        if getattr(_grad_local, "enabled", _grad_default) and any(isinstance(t, Tensor) and t.requires_grad for t in args):
+            ctx = Context()
+            output = cls.forward(ctx, *args, **kwargs)
             output._ctx = ctx
             output.grad_fn = cls
             output.requires_grad = True
+        else:
+            output = cls.forward(_NO_GRAD_CTX, *args, **kwargs)
+        if _tracer is not None:
+            _tracer.record(cls, args, output)
         return output
 
 class Tensor:
@@ -36,8 +121,23 @@ class Tensor:
         self.grad = None
         self.grad_fn = None
         self._ctx = None
+        self._topo = None
+        self._grad_buffers = None
     
-    def backward(self, grad_output=None):
+    @classmethod
+    def _wrap(cls, data):
+        """Wraps an ndarray owned by the engine without copying it"""
+        tensor = cls.__new__(cls)
+        tensor.data = data
+        tensor.requires_grad = False
+        tensor.grad = None
+        tensor.grad_fn = None
+        tensor._ctx = None
+        tensor._topo = None
+        tensor._grad_buffers = None
+        return tensor
+    
+    def backward(self, grad_output=None, retain_graph=False):
         if not self.requires_grad:
             raise RuntimeError("Called backward on non-requires-grad tensor")
         
@@ -45,33 +145,105 @@ class Tensor:
             grad_output = Tensor(1.0)
         self.grad = grad_output if isinstance(grad_output, Tensor) else Tensor(grad_output)
         
-        # Topological sort
-        visited = set()
-        topo = []
+        # Topological order is built once per graph and cached on the root while it is retained
+        topo = self._topo if self._topo is not None else self._build_topo()
+        if retain_graph:
+            self._topo = topo
+            order = reversed(topo)
+        else:
+            self._topo = None
+            order = _drain(topo)
         
-        def build_topo(tensor):
-            if tensor not in visited:
-                visited.add(tensor)
-                if tensor._ctx:
-                    for t in tensor._ctx.saved_tensors:
-                        if isinstance(t, Tensor):
-                            build_topo(t)
-                topo.append(tensor)
+        # Gradient buffers are recycled within a pass and kept with the graph while it is retained
+        buffers = self._grad_buffers if self._grad_buffers is not None else _GradBuffers()
+        self._grad_buffers = buffers if retain_graph else None
         
-        build_topo(self)
+        # Gradients travel as raw ndarrays; non-leaf ones only live until that tensor is processed
+        pending = {self: self.grad.data}
+        owned = set()
+        leaf_grads = {}
         
-        # Backward pass
-        for tensor in reversed(topo):
-            if tensor._ctx and tensor.grad_fn:
-                grads = tensor.grad_fn.backward(tensor._ctx, tensor.grad)
-                if not isinstance(grads, (list, tuple)):
-                    grads = (grads,)
-                
-                for t, g in zip(tensor._ctx.saved_tensors, grads):
-                    if isinstance(t, Tensor) and t.requires_grad:
-                        if t.grad is None:
-                            t.grad = Tensor(np.zeros_like(t.data))
-                        t.grad.data += g.data
+        # Backward pass; the profiler is looked up once so a disabled one costs a local check per node
+        profiler = _profiler
+        for tensor in order:
+            grad = pending.pop(tensor, None)
+            if tensor.grad_fn is None or grad is None:
+                continue
+            ctx = tensor._ctx
+            if ctx is None:
+                raise RuntimeError("Trying to backward through the graph a second time; "
+                                   "call backward with retain_graph=True the first time")
+            
+            if profiler is None:
+                grads = tensor.grad_fn.backward(ctx, grad)
+            else:
+                grads = profiler.record_backward(tensor.grad_fn, ctx, grad)
+            if not isinstance(grads, (list, tuple)):
+                grads = (grads,)
+            
+            pushed = []
+            for t, g in zip(ctx.saved_tensors, grads):
+                if not (isinstance(t, Tensor) and t.requires_grad) or g is None:
+                    continue
+                if isinstance(g, Tensor):
+                    g = g.data
+                pushed.append(g)
+                if t.grad_fn is None:
+                    acc = leaf_grads.get(t)
+                    if acc is None:
+                        if t.grad is not None:
+                            acc = leaf_grads[t] = t.grad.data
+                        else:
+                            acc = leaf_grads[t] = np.empty(t.data.shape, np.result_type(t.data, g))
+                            np.copyto(acc, g)
+                            continue
+                    np.add(acc, g, out=acc)
+                elif t not in pending:
+                    pending[t] = g
+                elif t in owned:
+                    pending[t] = buffers.accumulate(pending[t], g)
+                else:
+                    pending[t] = buffers.add(pending[t], g)
+                    owned.add(t)
+            
+            # A gradient buffer can be recycled unless it was passed straight through to an input
+            if tensor in owned:
+                owned.discard(tensor)
+                if not any(np.may_share_memory(grad, g) for g in pushed):
+                    buffers.release(grad)
+            
+            # Saved tensors are no longer needed once their gradients have been pushed
+            if not retain_graph:
+                tensor._ctx = None
+        
+        for t, acc in leaf_grads.items():
+            if t.grad is None:
+                t.grad = Tensor._wrap(acc)
+    
+    def _parents(self):
+        if self._ctx is None:
+            if self.grad_fn is not None:
+                raise RuntimeError("Trying to backward through the graph a second time; "
+                                   "call backward with retain_graph=True the first time")
+            return ()
+        return [t for t in self._ctx.saved_tensors if isinstance(t, Tensor) and t.requires_grad]
+    
+    def _build_topo(self):
+        """Iterative post-order DFS, so graph depth is not bounded by the recursion limit"""
+        visited = {self}
+        topo = []
+        stack = [(self, iter(self._parents()))]
+        while stack:
+            tensor, parents = stack[-1]
+            for parent in parents:
+                if parent not in visited:
+                    visited.add(parent)
+                    stack.append((parent, iter(parent._parents())))
+                    break
+            else:
+                stack.pop()
+                topo.append(tensor)
+        return topo
     
     def __add__(self, other):
         return Add.apply(self, other if isinstance(other, Tensor) else Tensor(other))
@@ -79,14 +251,45 @@ class Tensor:
     def __mul__(self, other):
         return Mul.apply(self, other if isinstance(other, Tensor) else Tensor(other))
     
+    def __matmul__(self, other):
+        return MatMul.apply(self, other if isinstance(other, Tensor) else Tensor(other))
+    
     def sin(self):
         return Sin.apply(self)
     
+    def sum(self, axis=None, keepdims=False):
+        return Sum.apply(self, axis=axis, keepdims=keepdims)
+    
+    def mean(self, axis=None, keepdims=False):
+        return Mean.apply(self, axis=axis, keepdims=keepdims)
+    
     def __repr__(self):
         return f"Tensor(data={self.data}, grad_fn={self.grad_fn.__name__ if self.grad_fn else None})"
 
+def _unbroadcast(grad, shape):
+    """Sums a broadcast gradient back down to the shape of the input it flows into"""
+    if np.shape(grad) == shape:
+        return grad
+    extra = np.ndim(grad) - len(shape)
+    if extra < 0:
+        return np.broadcast_to(grad, shape)
+    if extra:
+        grad = grad.sum(axis=tuple(range(extra)))
+    axes = tuple(i for i, n in enumerate(shape) if n == 1 and grad.shape[i] != 1)
+    if axes:
+        grad = grad.sum(axis=axes, keepdims=True)
+    return grad
+
+def _expand_reduced(grad, ctx):
+    """Restores the axes a Sum/Mean reduced away so grad broadcasts against the input"""
+    if ctx.axis is not None and not ctx.keepdims:
+        grad = np.expand_dims(grad, ctx.axis)
+    return grad
+
 # Operation Implementations
 class Add(Function):
+    kernel = np.add
+    
     @staticmethod
     def forward(ctx, a, b):
         ctx.save_for_backward(a, b)
@@ -94,30 +297,374 @@ class Add(Function):
     
     @staticmethod
     def backward(ctx, grad_output):
-        return grad_output, grad_output
+        a, b = ctx.saved_tensors
+        return _unbroadcast(grad_output, a.data.shape), _unbroadcast(grad_output, b.data.shape)
 
 class Mul(Function):
+    kernel = np.multiply
+    
     @staticmethod
     def forward(ctx, a, b):
         ctx.save_for_backward(a, b)
-        return Tensor(a.data * b.data,requires_grad=True)
+        return Tensor(a.data * b.data)
     
     @staticmethod
     def backward(ctx, grad_output):
         a, b = ctx.saved_tensors
-        return grad_output * b.data, grad_output * a.data
+        return (_unbroadcast(grad_output * b.data, a.data.shape),
+                _unbroadcast(grad_output * a.data, b.data.shape))
 
 class Sin(Function):
+    kernel = np.sin
+    
     @staticmethod
     def forward(ctx, x):
         ctx.save_for_backward(x)
-        return Tensor(np.sin(x.data),requires_grad=True)
+        return Tensor(np.sin(x.data))
     
     @staticmethod
     def backward(ctx, grad_output):
         x = ctx.saved_tensors[0]
         return grad_output * np.cos(x.data)
 
+class MatMul(Function):
+    """Matrix product with NumPy matmul semantics, including batched and 1-D operands"""
+    @staticmethod
+    def forward(ctx, a, b):
+        ctx.save_for_backward(a, b)
+        return Tensor(a.data @ b.data)
+    
+    @staticmethod
+    def backward(ctx, grad_output):
+        a, b = ctx.saved_tensors
+        a_data, b_data, grad = a.data, b.data, np.asarray(grad_output)
+        if a.data.ndim == 1 and b.data.ndim == 1:
+            # Dot product: the upstream gradient is 0-d, so there are no matrix axes to promote
+            return grad * b_data, grad * a_data
+        # 1-D operands are promoted to matrices the same way matmul does in forward
+        if a.data.ndim == 1:
+            a_data = a_data[np.newaxis, :]
+            grad = np.expand_dims(grad, -2)
+        if b.data.ndim == 1:
+            b_data = b_data[:, np.newaxis]
+            grad = np.expand_dims(grad, -1)
+        grad_a = grad @ np.swapaxes(b_data, -1, -2)
+        grad_b = np.swapaxes(a_data, -1, -2) @ grad
+        if a.data.ndim == 1:
+            grad_a = grad_a[..., 0, :]
+        if b.data.ndim == 1:
+            grad_b = grad_b[..., 0]
+        return _unbroadcast(grad_a, a.data.shape), _unbroadcast(grad_b, b.data.shape)
+
+class Sum(Function):
+    @staticmethod
+    def forward(ctx, x, axis=None, keepdims=False):
+        ctx.save_for_backward(x)
+        ctx.axis, ctx.keepdims = axis, keepdims
+        return Tensor(x.data.sum(axis=axis, keepdims=keepdims))
+    
+    @staticmethod
+    def backward(ctx, grad_output):
+        x = ctx.saved_tensors[0]
+        return np.broadcast_to(_expand_reduced(grad_output, ctx), x.data.shape)
+
+class Mean(Function):
+    @staticmethod
+    def forward(ctx, x, axis=None, keepdims=False):
+        ctx.save_for_backward(x)
+        ctx.axis, ctx.keepdims = axis, keepdims
+        output = x.data.mean(axis=axis, keepdims=keepdims)
+        ctx.count = x.data.size // max(np.size(output), 1)
+        return Tensor(output)
+    
+    @staticmethod
+    def backward(ctx, grad_output):
+        x = ctx.saved_tensors[0]
+        return np.broadcast_to(_expand_reduced(grad_output, ctx) / ctx.count, x.data.shape)
+
+# Graph Compilation
+class _Trace:
+    """Records Function applications while a compiled function is being traced"""
+    def __init__(self):
+        self.steps = []
+    
+    def record(self, fn, args, output):
+        self.steps.append((fn, args, output))
+
+class _Buffers:
+    """One set of a plan's preallocated buffers: slot values, per-step Contexts and gradients"""
+    def __init__(self, plan):
+        values = [None] * plan.n_slots
+        for i, like in enumerate(plan.input_templates):
+            values[i] = Tensor._wrap(like)  # rebound to the caller's data on each run
+        for i, t in plan.captured_slots:
+            values[i] = t  # read by reference, so later updates to captured tensors are seen
+        for i, like in plan.produced_slots:
+            values[i] = Tensor._wrap(np.empty_like(like))
+        self.values = values
+        self.ctxs = []
+        for _, in_slots, _ in plan.steps:
+            ctx = Context()
+            ctx.save_for_backward(*(values[i] for i in in_slots))
+            self.ctxs.append(ctx)
+        self.grads = [np.empty_like(t.data, dtype=np.result_type(t.data, float)) for t in values]
+
+class _Plan:
+    """
+    A traced op chain replayed as one fused node. Every intermediate lives in a buffer
+    allocated ahead of time, and each step keeps a prebuilt Context over those buffers so
+    the ops' own backward methods run without per-call allocations. A call owns its buffer
+    set until its graph node is freed, so one forward may replay the plan several times;
+    released sets go back to a small free-list.
+    """
+    max_free = 4
+    
+    def __init__(self, placeholders, trace, result):
+        slots = {}
+        templates = []
+        
+        def slot_of(t):
+            if t not in slots:
+                slots[t] = len(templates)
+                templates.append(t)
+            return slots[t]
+        
+        # Explicit inputs first
+        for p in placeholders:
+            slot_of(p)
+        self.n_inputs = len(placeholders)
+        
+        self.steps = []
+        produced = {}
+        for fn, args, output in trace.steps:
+            if fn.kernel is None:
+                raise NotImplementedError(f"{fn.__name__} has no fused kernel and cannot be traced")
+            in_slots = []
+            for t in args:
+                if not isinstance(t, Tensor):
+                    raise TypeError(f"Cannot trace non-Tensor argument to {fn.__name__}")
+                in_slots.append(slot_of(t))
+            out_slot = slot_of(output)
+            produced[out_slot] = output.data
+            self.steps.append((fn, in_slots, out_slot))
+        
+        if result not in slots:
+            raise ValueError("Compiled function must return a Tensor computed from its inputs")
+        self._out_slot = slots[result]
+        self.n_slots = len(templates)
+        self.produced_slots = list(produced.items())
+        
+        # Tensors the chain read but did not produce (constants, captured parameters)
+        self.captured_slots = [(i, t) for i, t in enumerate(templates)
+                               if i >= self.n_inputs and i not in produced]
+        self.captured = [t for _, t in self.captured_slots]
+        self._external_slots = list(range(self.n_inputs)) + [i for i, _ in self.captured_slots]
+        self._needs_grad = [True] * self.n_slots
+        for i, t in self.captured_slots:
+            self._needs_grad[i] = t.requires_grad
+        self.input_templates = [templates[i].data for i in range(self.n_inputs)]
+        self._free = []
+    
+    def acquire(self):
+        return self._free.pop() if self._free else _Buffers(self)
+    
+    def release(self, bufs):
+        if len(self._free) < self.max_free:
+            self._free.append(bufs)
+    
+    def forward(self, bufs, inputs):
+        values = bufs.values
+        for i in range(self.n_inputs):
+            values[i].data = inputs[i].data
+        for fn, in_slots, out_slot in self.steps:
+            fn.kernel(*(values[i].data for i in in_slots), out=values[out_slot].data)
+        return values[self._out_slot].data.copy()
+    
+    def backward(self, bufs, grad_output):
+        grads = bufs.grads
+        seen = [False] * len(grads)
+        np.copyto(grads[self._out_slot], grad_output)
+        seen[self._out_slot] = True
+        for (fn, in_slots, out_slot), ctx in zip(reversed(self.steps), reversed(bufs.ctxs)):
+            if not seen[out_slot]:
+                continue
+            step_grads = fn.backward(ctx, grads[out_slot])
+            if not isinstance(step_grads, (list, tuple)):
+                step_grads = (step_grads,)
+            for i, g in zip(in_slots, step_grads):
+                if not self._needs_grad[i]:
+                    continue
+                if seen[i]:
+                    np.add(grads[i], g, out=grads[i])
+                else:
+                    np.copyto(grads[i], g)
+                    seen[i] = True
+        return tuple(grads[i] if seen[i] else None for i in self._external_slots)
+
+class _Fused(Function):
+    @staticmethod
+    def forward(ctx, plan, *inputs):
+        bufs = plan.acquire()
+        output = Tensor(plan.forward(bufs, inputs))
+        if ctx is _NO_GRAD_CTX:
+            plan.release(bufs)
+        else:
+            ctx.save_for_backward(*inputs)
+            ctx.plan, ctx.buffers = plan, bufs
+            # The buffer set goes back to the plan once this node's Context is freed
+            weakref.finalize(ctx, plan.release, bufs)
+        return output
+    
+    @staticmethod
+    def backward(ctx, grad_output):
+        return ctx.plan.backward(ctx.buffers, grad_output)
+
+class CompiledFunction:
+    """
+    Traces fn once per input shape/dtype signature and replays the recorded chain of fusable
+    ops (Add/Mul/Sin) as a single graph node with reused intermediate buffers.
+    
+    Tensors fn reads from its enclosing scope are captured by reference and receive gradients.
+    Each call holds its own buffer set until its graph is freed, so a plan can be replayed
+    several times within one graph (e.g. f(a) + f(b)).
+    """
+    def __init__(self, fn):
+        self._fn = fn
+        self._plans = {}
+    
+    def __call__(self, *inputs):
+        global _tracer
+        inputs = [x if isinstance(x, Tensor) else Tensor(x) for x in inputs]
+        key = tuple((x.data.shape, x.data.dtype) for x in inputs)
+        plan = self._plans.get(key)
+        if plan is None:
+            placeholders = [Tensor(x.data) for x in inputs]
+            recording = _tracer = _Trace()
+            try:
+                result = self._fn(*placeholders)
+            finally:
+                _tracer = None
+            plan = self._plans[key] = _Plan(placeholders, recording, result)
+        return _Fused.apply(plan, *inputs, *plan.captured)
+
+def trace(fn):
+    """Opt-in compilation mode: wraps fn in a CompiledFunction"""
+    return CompiledFunction(fn)
+
+# Profiling
+# Active Profiler, None otherwise
+_profiler = None
+
+def _nbytes(tensors):
+    return sum(t.data.nbytes for t in tensors if isinstance(t, Tensor))
+
+class _OpStats:
+    def __init__(self):
+        self.forward_calls = 0
+        self.forward_ns = 0
+        self.backward_calls = 0
+        self.backward_ns = 0
+        self.output_bytes = 0
+        self.saved_bytes = 0
+
+class Profiler:
+    """
+    Opt-in per-op instrumentation for Function.apply and the backward loop.
+    
+    While active it swaps Function.apply for a timed version and is picked up by
+    Tensor.backward, so nothing is instrumented once it exits.
+    
+    Usage:
+        with Profiler() as prof:
+            loss.backward()
+        print(prof.table())
+        prof.export_chrome_trace("trace.json")
+    """
+    def __init__(self, record_events=True):
+        self.record_events = record_events
+        self.stats = {}
+        self.events = []
+        self._origin_ns = None
+        self._apply = None
+    
+    def __enter__(self):
+        global _profiler
+        if _profiler is not None:
+            raise RuntimeError("Another Profiler is already active")
+        _profiler = self
+        self._origin_ns = time.perf_counter_ns()
+        self._apply = Function.__dict__["apply"]
+        apply = self._apply.__func__
+        
+        def profiled_apply(cls, *args, **kwargs):
+            start = time.perf_counter_ns()
+            output = apply(cls, *args, **kwargs)
+            self._record_forward(cls, output, start, time.perf_counter_ns())
+            return output
+        
+        Function.apply = classmethod(profiled_apply)
+        return self
+    
+    def __exit__(self, exc_type, exc_value, traceback):
+        global _profiler
+        Function.apply = self._apply
+        _profiler = None
+        return False
+    
+    def _stats_for(self, fn):
+        stats = self.stats.get(fn.__name__)
+        if stats is None:
+            stats = self.stats[fn.__name__] = _OpStats()
+        return stats
+    
+    def _record_forward(self, fn, output, start, end):
+        stats = self._stats_for(fn)
+        stats.forward_calls += 1
+        stats.forward_ns += end - start
+        output_bytes = output.data.nbytes
+        saved_bytes = _nbytes(output._ctx.saved_tensors) if output._ctx is not None else 0
+        stats.output_bytes += output_bytes
+        stats.saved_bytes += saved_bytes
+        if self.record_events:
+            self._event(fn.__name__, "forward", start, end,
+                        {"output_bytes": output_bytes, "saved_bytes": saved_bytes})
+    
+    def record_backward(self, fn, ctx, grad_output):
+        start = time.perf_counter_ns()
+        grads = fn.backward(ctx, grad_output)
+        end = time.perf_counter_ns()
+        stats = self._stats_for(fn)
+        stats.backward_calls += 1
+        stats.backward_ns += end - start
+        if self.record_events:
+            self._event(fn.__name__, "backward", start, end, {})
+        return grads
+    
+    def _event(self, name, category, start, end, args):
+        self.events.append({
+            "name": name, "cat": category, "ph": "X",
+            "ts": (start - self._origin_ns) / 1e3, "dur": (end - start) / 1e3,
+            "pid": os.getpid(), "tid": threading.get_ident(), "args": args,
+        })
+    
+    def table(self):
+        """Summary of every op seen, slowest (forward + backward) first"""
+        header = f"{'Op':<12}{'Fwd calls':>10}{'Fwd ms':>10}{'Bwd calls':>10}{'Bwd ms':>10}" \
+                 f"{'Out bytes':>12}{'Saved bytes':>13}"
+        rows = [header, "-" * len(header)]
+        ranked = sorted(self.stats.items(), key=lambda kv: kv[1].forward_ns + kv[1].backward_ns,
+                        reverse=True)
+        for name, st in ranked:
+            rows.append(f"{name:<12}{st.forward_calls:>10}{st.forward_ns / 1e6:>10.3f}"
+                        f"{st.backward_calls:>10}{st.backward_ns / 1e6:>10.3f}"
+                        f"{st.output_bytes:>12}{st.saved_bytes:>13}")
+        return "\n".join(rows)
+    
+    def export_chrome_trace(self, path):
+        """Writes recorded events in Chrome trace format (chrome://tracing, Perfetto)"""
+        with open(path, "w") as f:
+            json.dump({"traceEvents": self.events, "displayTimeUnit": "ms"}, f)
+
 # Example Usage
 if __name__ == "__main__":
     print("=== Autograd System Demo ===")